@@ -0,0 +1,152 @@
+"""
+Admission control for Metasploit Recon Backend
+Each framework process costs hundreds of MB, so launches wait until the live
+children (RSS and CPU sampled from /proc per process group) leave room in the
+configured memory budget
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from thread_tuning import available_memory_mb
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+class AdmissionTimeoutError(Exception):
+    """No room in the memory budget before the launch's timeout: nothing was started"""
+
+
+def read_process_groups(pgids: Set[int]) -> Dict[int, Tuple[float, float]]:
+    """Total (RSS MB, CPU seconds) per process group from /proc; empty where /proc is missing"""
+    totals: Dict[int, Tuple[float, float]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return totals
+
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields after its closing paren are fixed
+        fields = stat[stat.rfind(")") + 2:].split()
+        pgrp = int(fields[2])
+        if pgrp not in pgids:
+            continue
+        rss_mb = int(fields[21]) * PAGE_SIZE / (1024 * 1024)
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+        rss, cpu = totals.get(pgrp, (0.0, 0.0))
+        totals[pgrp] = (rss + rss_mb, cpu + cpu_seconds)
+    return totals
+
+
+@dataclass
+class Ticket:
+    """One admitted framework process"""
+    label: str
+    pgid: Optional[int] = None
+    rss_mb: float = 0.0
+    cpu_seconds: float = 0.0
+    cpu_percent: float = 0.0
+    sampled_at: float = field(default_factory=time.monotonic)
+
+
+class AdmissionController:
+    """Holds framework launches until their memory fits in the budget"""
+
+    def __init__(self, memory_budget_mb: int, launch_estimate_mb: int, sample_interval: float = 2.0):
+        self.memory_budget_mb = memory_budget_mb
+        self.launch_estimate_mb = launch_estimate_mb
+        self.sample_interval = sample_interval
+        self.tickets: List[Ticket] = []
+        self.waiting = 0
+        self.condition = asyncio.Condition()
+        self._sampler: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._sampler = asyncio.create_task(self._sample_loop())
+
+    async def stop(self):
+        if self._sampler:
+            self._sampler.cancel()
+
+    def charge_mb(self, ticket: Ticket) -> float:
+        # The estimate is a floor: a booting framework has not reached its steady RSS yet
+        return max(ticket.rss_mb, self.launch_estimate_mb)
+
+    def used_mb(self) -> float:
+        return sum(self.charge_mb(ticket) for ticket in self.tickets)
+
+    def _fits(self) -> bool:
+        # Always admit one process, or nothing could ever run under a tiny budget
+        return not self.tickets or self.used_mb() + self.launch_estimate_mb <= self.memory_budget_mb
+
+    @asynccontextmanager
+    async def admit(self, label: str, timeout: Optional[float] = None) -> AsyncIterator[Ticket]:
+        """Wait (up to timeout) for room in the budget; attach the child's pid to the ticket"""
+        ticket = Ticket(label)
+        async with self.condition:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.condition.wait_for(self._fits), timeout)
+            except asyncio.TimeoutError:
+                raise AdmissionTimeoutError(
+                    f"Admission timed out after {timeout:g}s waiting for framework memory"
+                ) from None
+            finally:
+                self.waiting -= 1
+            self.tickets.append(ticket)
+        try:
+            yield ticket
+        finally:
+            async with self.condition:
+                self.tickets.remove(ticket)
+                self.condition.notify_all()
+
+    async def _sample_loop(self):
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            tracked = [ticket for ticket in self.tickets if ticket.pgid]
+            if not tracked:
+                continue
+            totals = await asyncio.to_thread(read_process_groups, {ticket.pgid for ticket in tracked})
+            now = time.monotonic()
+            for ticket in tracked:
+                if ticket.pgid not in totals:
+                    continue
+                rss_mb, cpu_seconds = totals[ticket.pgid]
+                elapsed = now - ticket.sampled_at
+                if elapsed > 0:
+                    ticket.cpu_percent = 100 * (cpu_seconds - ticket.cpu_seconds) / elapsed
+                ticket.rss_mb, ticket.cpu_seconds, ticket.sampled_at = rss_mb, cpu_seconds, now
+            # Usage may have dropped, letting a waiting launch in
+            async with self.condition:
+                self.condition.notify_all()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "memory_budget_mb": self.memory_budget_mb,
+            "memory_used_mb": round(self.used_mb(), 1),
+            "launch_estimate_mb": self.launch_estimate_mb,
+            "system_available_mb": available_memory_mb(),
+            "waiting": self.waiting,
+            "running": [
+                {
+                    "label": ticket.label,
+                    "pid": ticket.pgid,
+                    "rss_mb": round(ticket.rss_mb, 1),
+                    "cpu_percent": round(ticket.cpu_percent, 1)
+                }
+                for ticket in self.tickets
+            ]
+        }
@@ -5,24 +5,49 @@ Secure backend for managing Metasploit reconnaissance operations
 """
 
 import os
+import sys
 import json
 import uuid
 import asyncio
-import subprocess
-import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Any
+from dataclasses import dataclass
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, validator
 import uvicorn
 
+from admission import AdmissionController, AdmissionTimeoutError, Ticket
+from batch import compile_batch_script, demultiplex_output
+from checkpoint import JobCheckpointer
+from compression import default_codec, find_stored, iter_range, store_text
+from config import Config
+from framework_cache import FrameworkCache
+from job_state import JobSnapshot, JobState
+from job_store import JobFilter, JobStore, decode_cursor, encode_cursor, sqlite_path, status_row
+from joblog import JobLog, read_stored_log
+from msf_db import MsfDatabase, MsfIngestor, db_connect_command, framework_database_config
+from module_metadata import ModuleMetadataCache
+from msf_rpc import MsfRpcPool
+from parsers import parse_output
+from planner import PlannedTool, plan_job, run_plan
+from processes import lower_priority, pump_lines, sweep_process_group, terminate_process_group
+from redis_queue import RedisTaskQueue
+from retention import ResultRetention
+from result_cache import ResultCache
+from scheduler import JobScheduler, QueueFullError
+from sharding import merge_shard_results, shard_target
+from thread_tuning import ThreadTuner
+from timeouts import DEFAULT_TOOL_TIMEOUT, JobDeadline, RuntimeHistory, resolve_tool_timeout
+from tools import MODULE_MAPPING, TOOL_CATALOG, build_module_commands
+from workspace import make_dir, read_text, write_text
+
 # Security and validation
 security = HTTPBearer(auto_error=False)
 
@@ -39,6 +64,9 @@ class Job:
     results: List[Dict[str, Any]] = None
     error: Optional[str] = None
     user: str = "default"
+    priority: int = 0
+    progress: Optional[Dict[str, Dict[str, int]]] = None  # per-tool shard progress
+    force_refresh: bool = False
 
 class ToolConfig(BaseModel):
     name: str
@@ -48,6 +76,8 @@ class ReconRequest(BaseModel):
     target: str
     profile_name: str = "Unnamed Scan"
     tools: List[ToolConfig]
+    priority: int = 0  # 0 (lowest) to 10 (highest)
+    force_refresh: bool = False  # bypass cached results
     
     @validator('target')
     def validate_target(cls, v):
@@ -58,6 +88,12 @@ class ReconRequest(BaseModel):
         # Additional validation could be added here
         # (IP format, hostname format, etc.)
         return v.strip()
+    
+    @validator('priority')
+    def validate_priority(cls, v):
+        if not 0 <= v <= 10:
+            raise ValueError('Priority must be between 0 and 10')
+        return v
 
 class JobResponse(BaseModel):
     job_id: str
@@ -74,6 +110,9 @@ class JobStatus(BaseModel):
     completed_at: Optional[str]
     error: Optional[str]
     results_count: int
+    queue_position: Optional[int] = None
+    eta_seconds: Optional[int] = None
+    progress: Optional[Dict[str, Dict[str, int]]] = None
 
 class MetasploitReconBackend:
     def __init__(self):
@@ -91,9 +130,10 @@ class MetasploitReconBackend:
             "http://127.0.0.1:8080"
         ]
         
-        # Job management
-        self.jobs: Dict[str, Job] = {}
-        self.job_lock = threading.Lock()
+        # Job management: pending and running jobs in memory, history in the job store.
+        # Readers use each job's published snapshot; writers lock only that job
+        self.jobs: Dict[str, JobState] = {}
+        self.job_logs: Dict[str, JobLog] = {}
         
         # Metasploit configuration
         self.msf_path = os.getenv('MSF_PATH', '/opt/metasploit-framework')
@@ -101,12 +141,114 @@ class MetasploitReconBackend:
         self.workspace_dir = Path('./workspace')
         self.workspace_dir.mkdir(exist_ok=True)
         
+        # Only result summaries stay in memory; full results are spilled to the
+        # workspace and read back through a bounded cache. History is capped by
+        # job count and spilled bytes; expired jobs lose their workspace
+        # Tool outputs and spilled results are stored compressed (zstd, else gzip)
+        self.output_codec = default_codec() if Config.OUTPUT_COMPRESSION else None
+        self.retention = ResultRetention(
+            self.workspace_dir,
+            Config.RESULT_HYDRATION_CACHE_MB * 1024 * 1024,
+            codec=self.output_codec,
+            level=Config.OUTPUT_COMPRESSION_LEVEL
+        )
+        self.job_store = JobStore(
+            sqlite_path(Config.DATABASE_URL),
+            max_jobs=Config.MAX_JOB_HISTORY,
+            flush_interval=Config.JOB_STORE_FLUSH_INTERVAL,
+            max_bytes=Config.MAX_RESULT_STORAGE_MB * 1024 * 1024,
+            on_expire=self.retention.expire
+        )
+        
+        # Per-tool checkpoints in each job's workspace, for resuming after a restart
+        self.checkpoints = JobCheckpointer(self.workspace_dir)
+        self.shutting_down = False
+        
+        # Writable bootsnap/module cache for every framework launch. With ingestion
+        # the framework boots connected to its database, to record findings there
+        self.msf_database = (
+            framework_database_config(Config.MSF_DB_URL, Config.MSF_DB_POOL_SIZE) if Config.MSF_DB_INGEST else None
+        )
+        self.framework_cache = FrameworkCache(Config.MSF_CACHE_DIR, self.msf_database)
+        self.framework_cache.prepare()
+        self.prewarm_task: Optional[asyncio.Task] = None
+        
+        # Module options/defaults/types for /api/tools and config validation; built on first use
+        self.module_metadata = ModuleMetadataCache(
+            self.msf_path,
+            cache_file=Config.MSF_CACHE_DIR / "module-metadata.json" if self.framework_cache.writable else None,
+            store_files=[
+                Config.MSF_CACHE_DIR / ".msf4" / "store" / "modules_metadata.json",
+                Path(self.msf_path) / "db" / "modules_metadata_base.json"
+            ]
+        )
+        
+        # Warm msfrpcd workers; started with the application
+        self.rpc_pool: Optional[MsfRpcPool] = None
+        if Config.MSF_RPC_ENABLED:
+            self.rpc_pool = MsfRpcPool(
+                size=Config.MSF_RPC_WORKERS,
+                host=Config.MSF_RPC_HOST,
+                base_port=Config.MSF_RPC_PORT,
+                username=Config.MSF_RPC_USER,
+                password=Config.MSF_RPC_PASSWORD,
+                msfrpcd_path=Config.MSF_RPCD_PATH if Config.MSF_RPC_SPAWN else None,
+                max_uses=Config.MSF_RPC_MAX_USES,
+                niceness=Config.SCAN_NICENESS,
+                env=self.framework_cache.env()
+            )
+        
+        # Optional: hand tool runs to scanner worker nodes through Redis
+        self.task_queue: Optional[RedisTaskQueue] = None
+        if Config.DISTRIBUTED_EXECUTION:
+            self.task_queue = RedisTaskQueue.from_url(
+                Config.REDIS_URL,
+                lease_seconds=Config.TASK_LEASE_SECONDS,
+                max_attempts=Config.TASK_MAX_ATTEMPTS
+            )
+        
+        # Global scheduler: bounds concurrently running jobs
+        self.scheduler = JobScheduler(
+            runner=self.execute_job,
+            workers=Config.MAX_CONCURRENT_JOBS,
+            max_pending=Config.MAX_PENDING_JOBS
+        )
+        
+        # Observed tool runtimes, used for adaptive timeouts
+        self.runtime_history = RuntimeHistory()
+        
+        # Framework launches wait for room in the memory budget
+        self.admission = AdmissionController(
+            memory_budget_mb=Config.MSF_MEMORY_BUDGET_MB,
+            launch_estimate_mb=Config.MSF_LAUNCH_ESTIMATE_MB,
+            sample_interval=Config.ADMISSION_SAMPLE_INTERVAL
+        )
+        
+        # Adaptive module THREADS per tool, fed back from each run
+        self.thread_tuner = ThreadTuner()
+        
+        # Recent scan results, reused for repeat scans of the same target
+        self.result_cache = ResultCache(
+            Config.RESULT_CACHE_TTLS,
+            Config.RESULT_CACHE_MAX_ENTRIES,
+            max_bytes=Config.RESULT_CACHE_MAX_MB * 1024 * 1024
+        )
+        
+        # Output parsing runs in separate processes so large outputs do not stall the API
+        self.parser_pool = ProcessPoolExecutor(max_workers=Config.PARSER_WORKERS)
+        
+        # Optional: read findings from the framework database per job workspace
+        self.msf_ingestor: Optional[MsfIngestor] = None
+        if Config.MSF_DB_INGEST:
+            self.msf_ingestor = MsfIngestor(MsfDatabase.from_url(Config.MSF_DB_URL, Config.MSF_DB_POOL_SIZE))
+        
         # Security: Rate limiting and access control
         self.rate_limits = {}
         self.max_requests_per_minute = 10
         
         self.setup_middleware()
         self.setup_routes()
+        self.setup_events()
     
     def setup_middleware(self):
         """Configure CORS and security middleware"""
@@ -118,6 +260,37 @@ class MetasploitReconBackend:
             allow_headers=["*"],
         )
     
+    def setup_events(self):
+        """Start and stop long-lived resources with the application"""
+        
+        @self.app.on_event("startup")
+        async def startup():
+            await self.job_store.start()
+            if self.rpc_pool:
+                await self.rpc_pool.start()
+            if self.msf_ingestor:
+                await self.msf_ingestor.database.connect()
+            await self.admission.start()
+            self.start_prewarm()
+            await self.scheduler.start()
+            await self.resume_jobs()
+        
+        @self.app.on_event("shutdown")
+        async def shutdown():
+            self.shutting_down = True
+            await self.scheduler.stop()
+            if self.prewarm_task:
+                self.prewarm_task.cancel()
+            await self.admission.stop()
+            if self.rpc_pool:
+                await self.rpc_pool.stop()
+            self.parser_pool.shutdown(wait=False, cancel_futures=True)
+            if self.msf_ingestor:
+                await self.msf_ingestor.database.close()
+            if self.task_queue:
+                await self.task_queue.close()
+            await self.job_store.stop()
+    
     def setup_routes(self):
         """Define API routes"""
         
@@ -125,10 +298,18 @@ class MetasploitReconBackend:
         async def root():
             return {"message": "Metasploit Recon API", "version": "1.0.0"}
         
+        @self.app.get("/api/status")
+        async def get_status():
+            """Framework process memory budget, cache state and result retention metrics"""
+            return {
+                "admission": self.admission.status(),
+                "framework_cache": self.framework_cache.status(),
+                "results": {**self.job_store.status(), **self.retention.status()}
+            }
+        
         @self.app.post("/api/jobs", response_model=JobResponse)
         async def create_job(
             request: ReconRequest,
-            background_tasks: BackgroundTasks,
             credentials: HTTPAuthorizationCredentials = Depends(security)
         ):
             """Create a new reconnaissance job"""
@@ -148,23 +329,57 @@ class MetasploitReconBackend:
                     detail="Target not authorized for scanning"
                 )
             
+            # Reject option values msfconsole would refuse before the job takes a slot
+            await self.module_metadata.ensure_loaded()
+            errors = [
+                error
+                for tool in request.tools
+                for error in self.module_metadata.validate(tool.name, tool.config)
+            ]
+            if errors:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=errors
+                )
+            
             # Create job
             job_id = str(uuid.uuid4())
             job = Job(
                 id=job_id,
                 target=request.target,
                 profile_name=request.profile_name,
-                tools=[asdict(tool) for tool in request.tools],
+                tools=[tool.model_dump() for tool in request.tools],
                 status="pending",
                 created_at=datetime.utcnow().isoformat(),
-                results=[]
+                results=[],
+                priority=request.priority,
+                force_refresh=request.force_refresh
             )
             
-            with self.job_lock:
-                self.jobs[job_id] = job
+            # Shed load once the pending queue is full, before anything is persisted
+            try:
+                self.scheduler.check_capacity()
+            except QueueFullError as e:
+                raise self.queue_full(e)
+            
+            state = self.track_job(job, new=True)
+            await make_dir(self.workspace_dir / job_id)
+            await self.checkpoints.save(state.snapshot)
             
-            # Start job execution in background
-            background_tasks.add_task(self.execute_job, job_id)
+            # Queue for execution
+            try:
+                await self.scheduler.submit(job_id, request.priority)
+            except QueueFullError as e:
+                # Filled up by concurrent submissions meanwhile: the row may already be
+                # written, so record the rejection instead of leaving it pending
+                with state.update():
+                    job.status = "failed"
+                    job.completed_at = datetime.utcnow().isoformat()
+                    job.error = "Rejected: job queue full"
+                self.jobs.pop(job_id, None)
+                await self.checkpoints.save(state.snapshot)
+                self.checkpoints.forget(job_id)
+                raise self.queue_full(e)
             
             return JobResponse(
                 job_id=job_id,
@@ -175,159 +390,200 @@ class MetasploitReconBackend:
         @self.app.get("/api/jobs/{job_id}", response_model=JobStatus)
         async def get_job_status(job_id: str):
             """Get job status and basic information"""
-            with self.job_lock:
-                if job_id not in self.jobs:
-                    raise HTTPException(status_code=404, detail="Job not found")
-                
-                job = self.jobs[job_id]
-                return JobStatus(
-                    id=job.id,
-                    target=job.target,
-                    profile_name=job.profile_name,
-                    status=job.status,
-                    created_at=job.created_at,
-                    started_at=job.started_at,
-                    completed_at=job.completed_at,
-                    error=job.error,
-                    results_count=len(job.results) if job.results else 0
-                )
+            state = self.jobs.get(job_id)
+            if state:
+                return self.build_job_status(state.snapshot)
+            
+            row = await asyncio.to_thread(self.job_store.get_job, job_id)
+            if row is None:
+                raise HTTPException(status_code=404, detail="Job not found")
+            return self.build_stored_job_status(row)
         
         @self.app.get("/api/jobs/{job_id}/results")
         async def get_job_results(job_id: str):
             """Get detailed job results"""
-            with self.job_lock:
-                if job_id not in self.jobs:
-                    raise HTTPException(status_code=404, detail="Job not found")
-                
-                job = self.jobs[job_id]
+            state = self.jobs.get(job_id)
+            if state:
+                job = state.snapshot
                 return {
                     "job_id": job_id,
                     "status": job.status,
-                    "results": job.results or [],
+                    "results": await self.retention.hydrate(job_id, job.results),
                     "error": job.error
                 }
+            
+            row = await asyncio.to_thread(self.job_store.get_job, job_id)
+            if row is None:
+                raise HTTPException(status_code=404, detail="Job not found")
+            stored = await asyncio.to_thread(self.job_store.get_results, job_id)
+            return {
+                "job_id": job_id,
+                "status": row["status"],
+                "results": await self.retention.hydrate(job_id, stored),
+                "error": row["error"]
+            }
+        
+        @self.app.get("/api/jobs/{job_id}/log")
+        async def get_job_log(job_id: str, after: int = 0, limit: int = 1000):
+            """Get live console lines with sequence numbers greater than `after`"""
+            state = self.jobs.get(job_id)
+            job_status = state.snapshot.status if state else None
+            if job_status is None:
+                row = await asyncio.to_thread(self.job_store.get_job, job_id)
+                if row is None:
+                    raise HTTPException(status_code=404, detail="Job not found")
+                job_status = row["status"]
+            
+            limit = min(max(1, limit), 10000)
+            log = self.job_logs.get(job_id)
+            if log:
+                entries = log.read(after, limit)
+            elif job_status in ("pending", "running"):
+                entries = []
+            else:
+                # The live log is dropped once the job finishes: replay its stored outputs
+                entries = await asyncio.to_thread(read_stored_log, self.workspace_dir / job_id, after, limit)
+            return {
+                "job_id": job_id,
+                "status": job_status,
+                "entries": entries,
+                "next_after": entries[-1]["seq"] if entries else after,
+                # Lines between `after` and this seq were dropped from the bounded log
+                "first_seq": log.first_seq() if log else 1
+            }
+        
+        @self.app.get("/api/jobs/{job_id}/output/{name}")
+        async def get_job_output(job_id: str, name: str, start: int = 0, end: Optional[int] = None):
+            """Stream a tool's console output (`<output_name>`, `<output_name>.shard<N>` or `batch`), optionally bytes [start, end)"""
+            if job_id not in self.jobs and await asyncio.to_thread(self.job_store.get_job, job_id) is None:
+                raise HTTPException(status_code=404, detail="Job not found")
+            # Names map onto workspace files: no path separators
+            if "/" in name or "\\" in name or name.startswith("."):
+                raise HTTPException(status_code=400, detail="Invalid output name")
+            
+            path = self.workspace_dir / job_id / f"{name}_output.txt"
+            if find_stored(path) is None:
+                raise HTTPException(status_code=404, detail="Output not found")
+            # Decompressed frame by frame while it is sent
+            return StreamingResponse(iter_range(path, max(0, start), end), media_type="text/plain")
         
         @self.app.get("/api/jobs")
-        async def list_jobs(limit: int = 50, offset: int = 0):
-            """List all jobs with pagination"""
-            with self.job_lock:
-                job_list = list(self.jobs.values())
-                job_list.sort(key=lambda x: x.created_at, reverse=True)
-                
-                start = offset
-                end = offset + limit
-                jobs_page = job_list[start:end]
-                
-                return {
-                    "jobs": [
-                        JobStatus(
-                            id=job.id,
-                            target=job.target,
-                            profile_name=job.profile_name,
-                            status=job.status,
-                            created_at=job.created_at,
-                            started_at=job.started_at,
-                            completed_at=job.completed_at,
-                            error=job.error,
-                            results_count=len(job.results) if job.results else 0
-                        ) for job in jobs_page
-                    ],
-                    "total": len(job_list),
-                    "offset": offset,
-                    "limit": limit
-                }
+        async def list_jobs(limit: int = 50, offset: int = 0, after: Optional[str] = None,
+                            status: Optional[str] = None, target: Optional[str] = None,
+                            profile_name: Optional[str] = None, user: Optional[str] = None,
+                            created_after: Optional[str] = None, created_before: Optional[str] = None):
+            """List jobs, newest first; pass `after` (a previous `next_cursor`) for keyset paging"""
+            try:
+                after_key = decode_cursor(after) if after else None
+                filters = JobFilter(status, target, profile_name, user, created_after, created_before)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            
+            limit = min(max(1, limit), 1000)
+            offset = max(0, offset)
+            rows, total = await asyncio.to_thread(self.job_store.list_jobs, limit, offset, after_key, filters)
+            jobs_page = []
+            for row in rows:
+                # Live view for jobs still in memory; stored rows already hold the status fields
+                state = self.jobs.get(row["id"])
+                jobs_page.append(self.build_job_status(state.snapshot).model_dump() if state else status_row(row))
+            
+            # Plain dicts straight to JSON; the generic encoder dominates large pages
+            return JSONResponse({
+                "jobs": jobs_page,
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+                "next_cursor": encode_cursor(rows[-1]) if rows and len(rows) == limit else None
+            })
         
         @self.app.delete("/api/jobs/{job_id}")
         async def cancel_job(job_id: str):
-            """Cancel a running job"""
-            with self.job_lock:
-                if job_id not in self.jobs:
+            """Cancel a pending or running job"""
+            state = self.jobs.get(job_id)
+            if state is None:
+                if await asyncio.to_thread(self.job_store.get_job, job_id) is None:
                     raise HTTPException(status_code=404, detail="Job not found")
-                
-                job = self.jobs[job_id]
-                if job.status == "running":
-                    job.status = "cancelled"
-                    job.completed_at = datetime.utcnow().isoformat()
-                    return {"message": "Job cancelled successfully"}
-                else:
+                raise HTTPException(
+                    status_code=400, 
+                    detail="Job cannot be cancelled in current status"
+                )
+            
+            with state.update() as job:
+                # Dequeue a pending job, or stop a running one and kill its scans
+                if not (job.status in ("pending", "running") and self.scheduler.cancel(job_id)):
                     raise HTTPException(
                         status_code=400, 
                         detail="Job cannot be cancelled in current status"
                     )
+                job.status = "cancelled"
+                job.completed_at = datetime.utcnow().isoformat()
+            if job_id not in self.scheduler.tasks:
+                # Was still queued; a running job leaves memory when its task ends
+                self.jobs.pop(job_id, None)
+            
+            # Cancelled jobs are not resumed after a restart
+            await self.checkpoints.save(state.snapshot)
+            return {"message": "Job cancelled successfully"}
         
         @self.app.get("/api/tools")
         async def list_available_tools():
             """List available reconnaissance tools"""
-            return {
-                "tools": [
-                    {
-                        "name": "ping-sweep",
-                        "description": "Ping sweep to discover live hosts",
-                        "category": "discovery",
-                        "config_options": ["timeout", "threads"]
-                    },
-                    {
-                        "name": "tcp-syn-scan",
-                        "description": "TCP SYN port scan",
-                        "category": "port_scan",
-                        "config_options": ["port_range", "threads", "timeout"]
-                    },
-                    {
-                        "name": "udp-scan",
-                        "description": "UDP port scan",
-                        "category": "port_scan",
-                        "config_options": ["port_range", "timeout"]
-                    },
-                    {
-                        "name": "service-version-scan",
-                        "description": "Service and version detection",
-                        "category": "service_scan",
-                        "config_options": ["intensity", "timeout"]
-                    },
-                    {
-                        "name": "os-fingerprint",
-                        "description": "Operating system fingerprinting",
-                        "category": "fingerprint",
-                        "config_options": ["timeout"]
-                    },
-                    {
-                        "name": "smb-enum",
-                        "description": "SMB enumeration",
-                        "category": "network_service",
-                        "config_options": ["timeout", "username", "password"]
-                    },
-                    {
-                        "name": "snmp-enum",
-                        "description": "SNMP enumeration",
-                        "category": "network_service",
-                        "config_options": ["community_strings", "timeout"]
-                    },
-                    {
-                        "name": "dns-enum",
-                        "description": "DNS enumeration",
-                        "category": "network_service",
-                        "config_options": ["timeout", "threads"]
-                    },
-                    {
-                        "name": "web-crawl",
-                        "description": "Web crawling and spidering",
-                        "category": "web",
-                        "config_options": ["user_agent", "max_depth", "timeout"]
-                    },
-                    {
-                        "name": "web-app-scan",
-                        "description": "Web application vulnerability scanning",
-                        "category": "web",
-                        "config_options": ["timeout", "threads"]
-                    },
-                    {
-                        "name": "cve-lookup",
-                        "description": "CVE vulnerability lookup",
-                        "category": "vulnerability",
-                        "config_options": ["timeout"]
-                    }
-                ]
-            }
+            await self.module_metadata.ensure_loaded()
+            return {"tools": self.module_metadata.catalog(TOOL_CATALOG)}
+    
+    def queue_full(self, error: QueueFullError) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job queue is full",
+            headers={"Retry-After": str(error.retry_after)}
+        )
+    
+    def build_job_status(self, job: JobSnapshot) -> JobStatus:
+        """Build the API status view of a published job snapshot"""
+        return JobStatus(
+            id=job.id,
+            target=job.target,
+            profile_name=job.profile_name,
+            status=job.status,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            completed_at=job.completed_at,
+            error=job.error,
+            results_count=len(job.results),
+            queue_position=self.scheduler.position(job.id),
+            eta_seconds=self.scheduler.eta_seconds(job.id),
+            progress=job.progress
+        )
+    
+    def build_stored_job_status(self, row: Dict[str, Any]) -> JobStatus:
+        """Build the API status view of a job from its job store row"""
+        return JobStatus(
+            id=row["id"],
+            target=row["target"],
+            profile_name=row["profile_name"],
+            status=row["status"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            completed_at=row["completed_at"],
+            error=row["error"],
+            results_count=row["results_count"]
+        )
+    
+    def track_job(self, job: Job, new: bool) -> JobState:
+        """Hold a pending job in memory; every published version goes to the job store"""
+        state = JobState(job, on_publish=self.job_store.put_job)
+        self.jobs[job.id] = state
+        self.job_store.put_job(state.snapshot, new=new)
+        return state
+    
+    async def record_results(self, job: Job, entries: List[Dict]):
+        """Spill tool results to the workspace and append their summaries to the job and the job store"""
+        entries = [await self.retention.spill(job.id, entry) for entry in entries]
+        with self.jobs[job.id].update():
+            for entry in entries:
+                self.job_store.add_result(job.id, len(job.results), entry)
+                job.results.append(entry)
     
     def check_rate_limit(self, client_ip: str) -> bool:
         """Check if client has exceeded rate limit"""
@@ -385,126 +641,474 @@ class MetasploitReconBackend:
     
     async def execute_job(self, job_id: str):
         """Execute a reconnaissance job"""
-        with self.job_lock:
-            if job_id not in self.jobs:
-                return
-            job = self.jobs[job_id]
+        state = self.jobs.get(job_id)
+        if state is None:
+            return
+        self.job_logs.setdefault(job_id, JobLog(Config.JOB_LOG_MAX_LINES))
+        with state.update() as job:
             job.status = "running"
             job.started_at = datetime.utcnow().isoformat()
+            job.results = []
         
         try:
             # Create job workspace
             job_dir = self.workspace_dir / job_id
-            job_dir.mkdir(exist_ok=True)
+            await make_dir(job_dir)
+            
+            plan = plan_job(job.tools, job.target)
+            tool_results: Dict[int, Dict] = {}
+            deadline = JobDeadline(Config.JOB_TIMEOUT)
+            resumed = dict(self.checkpoints.completed.get(job_id, {}))
             
-            # Execute each tool
-            for tool_config in job.tools:
-                tool_name = tool_config['name']
-                tool_config_dict = tool_config['config']
+            async def run_tool(node: PlannedTool):
+                if node.index in resumed:
+                    # Finished before a restart: reuse the checkpointed result
+                    tool_results[node.index] = resumed[node.index]["result"]
+                    await self.record_results(job, [resumed[node.index]])
+                    return
                 
-                # Execute tool (this would integrate with actual Metasploit modules)
-                result = await self.execute_metasploit_tool(
-                    tool_name, 
-                    job.target, 
-                    tool_config_dict,
-                    job_dir
-                )
+                cached = None
+                if node.shares_run_of is None and not job.force_refresh:
+                    cached = self.result_cache.get(node.name, job.target, node.config)
+                
+                if node.shares_run_of is not None:
+                    # Identical module run already done for another tool
+                    result = self.shared_result(tool_results[node.shares_run_of], plan[node.shares_run_of])
+                elif cached:
+                    # Fresh result from an earlier scan of the same target
+                    result = cached
+                elif deadline.expired():
+                    result = {
+                        "success": False,
+                        "error": "Job timeout reached before tool started",
+                        "output": ""
+                    }
+                else:
+                    started = time.monotonic()
+                    
+                    # Execute tool (this would integrate with actual Metasploit modules)
+                    result = await self.execute_sharded_tool(job, node, job_dir, deadline)
+                    await self.attach_records(node.name, result)
+                    if self.msf_ingestor:
+                        await self.attach_msf_db_rows(job.id, node.index, result)
+                    if result.get("success"):
+                        self.runtime_history.record(node.name, job.target, time.monotonic() - started)
+                        self.result_cache.put(node.name, job.target, node.config, result)
+                    # The run's workspace files, for the output endpoint, checkpoints and retention
+                    result = {**result, "output_name": node.file_stem}
+                tool_results[node.index] = result
                 
                 # Store result
-                with self.job_lock:
-                    if job.results is None:
-                        job.results = []
-                    job.results.append({
-                        "tool": tool_name,
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "result": result
-                    })
+                entry = {
+                    "tool": node.name,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "result": result
+                }
+                await self.record_results(job, [entry])
+                await self.checkpoints.record_tools(job, {node.index: entry})
+            
+            if Config.MSF_BATCH_MODE and not self.rpc_pool and not self.task_queue:
+                # One framework boot for the whole job
+                batch_results = await self.execute_batch(job, job_dir, deadline, resumed)
+                await self.record_results(job, batch_results)
+            else:
+                # Execute tools in dependency order, independent branches in parallel
+                await run_plan(plan, run_tool, Config.JOB_PARALLELISM)
             
             # Mark job as completed
-            with self.job_lock:
+            with state.update():
                 job.status = "completed"
                 job.completed_at = datetime.utcnow().isoformat()
                 
+        except asyncio.CancelledError:
+            with state.update():
+                if self.shutting_down:
+                    # Interrupted by a backend shutdown: left resumable for the next start
+                    job.status = "pending"
+                else:
+                    # Cancelled through the API; running scans were already killed
+                    job.status = "cancelled"
+                    job.completed_at = job.completed_at or datetime.utcnow().isoformat()
+            raise
+            
         except Exception as e:
             # Mark job as failed
-            with self.job_lock:
+            with state.update():
                 job.status = "failed"
                 job.completed_at = datetime.utcnow().isoformat()
                 job.error = str(e)
+        
+        finally:
+            if self.msf_ingestor:
+                self.msf_ingestor.forget(job_id)
+            # Final status, so finished jobs are not resumed
+            await self.checkpoints.save(state.snapshot)
+            self.checkpoints.forget(job_id)
+            
+            # Finished jobs live only in the job store (the final version is already there)
+            self.jobs.pop(job_id, None)
+            # Clients tailing the log get a grace period to read the last lines
+            asyncio.get_running_loop().call_later(Config.JOB_LOG_GRACE_SECONDS, self.job_logs.pop, job_id, None)
     
-    async def execute_metasploit_tool(self, tool_name: str, target: str, config: Dict, job_dir: Path) -> Dict:
-        """Execute a Metasploit auxiliary module"""
+    async def execute_sharded_tool(self, job: Job, node: PlannedTool, job_dir: Path,
+                                   deadline: JobDeadline) -> Dict:
+        """Run a tool over target shards in parallel, retrying only the failed shards"""
+        shards = shard_target(job.target, Config.SHARD_SIZE, Config.MAX_SHARDS)
+        workspace = self.msf_ingestor.workspace_name(job.id, node.index) if self.msf_ingestor else None
+        if len(shards) == 1:
+            # Later tools only get what is left of the job budget
+            timeout = resolve_tool_timeout(node.name, job.target, deadline, self.runtime_history)
+            return await self.execute_tuned_tool(
+                node.name, job.target, node.config, job_dir, timeout,
+                file_stem=node.file_stem,
+                on_line=self.job_logs[job.id].writer(node.file_stem),
+                workspace=workspace
+            )
         
-        # Map tool names to Metasploit modules
-        module_mapping = {
-            "ping-sweep": "auxiliary/scanner/discovery/udp_sweep",
-            "tcp-syn-scan": "auxiliary/scanner/portscan/syn",
-            "udp-scan": "auxiliary/scanner/discovery/udp_sweep",
-            "service-version-scan": "auxiliary/scanner/portscan/tcp",
-            "os-fingerprint": "auxiliary/scanner/portscan/tcp",
-            "smb-enum": "auxiliary/scanner/smb/smb_enumshares",
-            "snmp-enum": "auxiliary/scanner/snmp/snmp_enum",
-            "dns-enum": "auxiliary/gather/dns_enum",
-            "web-crawl": "auxiliary/scanner/http/crawl",
-            "web-app-scan": "auxiliary/scanner/http/http_version",
-            "cve-lookup": "auxiliary/scanner/portscan/tcp"
-        }
+        results: List[Optional[Dict]] = [None] * len(shards)
+        attempts = [0] * len(shards)
+        slots = asyncio.Semaphore(max(1, Config.SHARD_PARALLELISM))
+        progress = {"total": len(shards), "completed": 0, "failed": 0}
+        state = self.jobs[job.id]
+        with state.update():
+            if job.progress is None:
+                job.progress = {}
+            job.progress[node.file_stem] = progress
+        
+        async def run_shard(i: int):
+            async with slots:
+                attempts[i] += 1
+                timeout = resolve_tool_timeout(node.name, shards[i], deadline, self.runtime_history)
+                file_stem = f"{node.file_stem}.shard{i}"
+                results[i] = await self.execute_tuned_tool(
+                    node.name, shards[i], node.config, job_dir, timeout,
+                    file_stem=file_stem,
+                    on_line=self.job_logs[job.id].writer(file_stem),
+                    workspace=workspace
+                )
+            with state.update():
+                progress["completed"] = sum(1 for r in results if r and r.get("success"))
+                progress["failed"] = sum(1 for r in results if r and not r.get("success"))
+        
+        remaining = list(range(len(shards)))
+        for _ in range(1 + Config.SHARD_RETRIES):
+            await asyncio.gather(*(run_shard(i) for i in remaining))
+            remaining = [i for i in remaining if not results[i].get("success")]
+            if not remaining or deadline.expired():
+                break
+        
+        return merge_shard_results(shards, results, attempts)
+    
+    async def execute_tuned_tool(self, tool_name: str, target: str, config: Dict, job_dir: Path,
+                                 timeout: float, **kwargs) -> Dict:
+        """Run a tool with an adaptive THREADS value unless the request set one"""
+        tuned = "threads" not in config
+        threads = self.thread_tuner.choose(tool_name, target) if tuned else config["threads"]
+        started = time.monotonic()
+        result = await self.execute_metasploit_tool(
+            tool_name, target, {**config, "threads": threads}, job_dir, timeout, **kwargs
+        )
+        # Runs that never launched say nothing about the thread count
+        if tuned and result.get("admitted", True):
+            self.thread_tuner.record(tool_name, target, threads, result, time.monotonic() - started, timeout)
+        result["threads"] = threads
+        return result
+    
+    async def execute_metasploit_tool(self, tool_name: str, target: str, config: Dict, job_dir: Path,
+                                      timeout: float = DEFAULT_TOOL_TIMEOUT,
+                                      file_stem: Optional[str] = None,
+                                      on_line: Optional[Callable[[str], None]] = None,
+                                      workspace: Optional[str] = None,
+                                      local: bool = False) -> Dict:
+        """Execute a Metasploit auxiliary module"""
         
-        module = module_mapping.get(tool_name)
+        module = MODULE_MAPPING.get(tool_name)
         if not module:
             return {"error": f"Unknown tool: {tool_name}"}
         
+        if self.task_queue and not local:
+            return await self.execute_remote_tool(tool_name, target, config, job_dir, timeout,
+                                                  file_stem, on_line, workspace)
+        
         # Create Metasploit resource file
-        resource_file = job_dir / f"{tool_name}.rc"
-        output_file = job_dir / f"{tool_name}_output.txt"
+        file_stem = file_stem or tool_name
+        resource_file = job_dir / f"{file_stem}.rc"
+        output_file = job_dir / f"{file_stem}_output.txt"
         
         # Generate Metasploit commands
-        commands = [
-            f"use {module}",
-            f"set RHOSTS {target}",
-            f"set THREADS {config.get('threads', 10)}",
-            f"set TIMEOUT {config.get('timeout', 5)}",
-            "run",
-            "exit"
-        ]
+        commands = build_module_commands(module, target, config)
+        if workspace:
+            # Record findings in the tool run's own msf workspace (created on first use)
+            commands[:0] = self.workspace_commands(workspace)
+        
+        if self.rpc_pool:
+            return await self.execute_rpc_tool(commands, output_file, timeout, on_line)
+        
+        commands.append("exit")
         
         # Write resource file
-        with open(resource_file, 'w') as f:
-            f.write('\n'.join(commands))
+        await write_text(resource_file, '\n'.join(commands))
         
         # Execute Metasploit
         try:
-            cmd = [
-                self.msf_console_path,
-                "-r", str(resource_file),
-                "-o", str(output_file)
-            ]
+            return_code, stderr = await self.run_msfconsole(resource_file, output_file, timeout, on_line)
+            
+            # Read the console spool, then keep it compressed
+            output = await read_text(output_file)
+            await self.store_output(output_file, output)
+            
+            return {
+                "success": return_code == 0,
+                "output": output,
+                "stderr": stderr,
+                "return_code": return_code,
+                "timeout": timeout
+            }
             
-            # Run in subprocess (in production, use proper async subprocess)
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
+        except AdmissionTimeoutError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "output": "",
+                "admitted": False
+            }
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "error": f"Tool execution timed out after {int(timeout)}s",
+                "output": ""
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "output": ""
+            }
+
+    async def run_msfconsole(self, resource_file: Path, output_file: Path, timeout: float,
+                             on_line: Optional[Callable[[str], None]] = None):
+        """Run msfconsole on a resource script, returning (return code, stderr)"""
+        # -o appends: drop the partial spool of a run interrupted by a restart
+        await asyncio.to_thread(output_file.unlink, missing_ok=True)
+        # Time spent waiting for memory headroom counts against the tool timeout
+        started = time.monotonic()
+        label = f"{resource_file.parent.name}/{resource_file.stem}"
+        async with self.admission.admit(label, timeout) as ticket:
+            remaining = max(0.0, timeout - (time.monotonic() - started))
+            return await self.spawn_msfconsole(resource_file, output_file, remaining, on_line, ticket)
+    
+    async def spawn_msfconsole(self, resource_file: Path, output_file: Path, timeout: float,
+                               on_line: Optional[Callable[[str], None]], ticket: Ticket):
+        """Spawn msfconsole at lowered priority and wait for it, killing its group on timeout"""
+        process = await asyncio.create_subprocess_exec(
+            self.msf_console_path,
+            "-r", str(resource_file),
+            "-o", str(output_file),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.framework_cache.env(),
+            start_new_session=True  # own process group, so ruby children die with it
+        )
+        # Ruby helpers are forked later and inherit the niceness
+        lower_priority(process.pid, Config.SCAN_NICENESS)
+        ticket.pgid = process.pid
+        
+        # The console echoes everything it spools, so stream it line by line
+        stdout_task = asyncio.create_task(pump_lines(process.stdout, on_line))
+        stderr_task = asyncio.create_task(process.stderr.read())
+        try:
+            await asyncio.wait_for(process.wait(), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            stdout_task.cancel()
+            stderr_task.cancel()
+            await terminate_process_group(process)
+            raise
+        finally:
+            sweep_process_group(process)
+        
+        # Orphans holding the pipes are gone now, so these finish promptly
+        await stdout_task
+        stderr = await stderr_task
+        return process.returncode, stderr.decode(errors='replace')
+    
+    async def resume_jobs(self):
+        """Re-queue jobs that were pending or running when the backend stopped"""
+        unfinished = await self.checkpoints.load_unfinished()
+        for job_fields, completed in sorted(unfinished, key=lambda item: item[0]["created_at"]):
+            job = Job(**{**job_fields, "status": "pending", "results": []})
+            state = self.track_job(job, new=await asyncio.to_thread(self.job_store.get_job, job.id) is None)
+            try:
+                await self.scheduler.submit(job.id, job.priority)
+            except QueueFullError:
+                with state.update():
+                    job.status = "failed"
+                    job.completed_at = datetime.utcnow().isoformat()
+                    job.error = "Not resumed after restart: job queue full"
+                self.jobs.pop(job.id, None)
+                await self.checkpoints.save(state.snapshot)
+                self.checkpoints.forget(job.id)
+    
+    def start_prewarm(self):
+        """Warm the framework cache in the background and record cold/warm boot times"""
+        if not Config.MSF_CACHE_PREWARM or not self.framework_cache.writable or self.task_queue:
+            return
+        
+        async def prewarm():
+            async with self.admission.admit("framework-cache/prewarm"):
+                await self.framework_cache.prewarm(self.msf_console_path)
+        
+        self.prewarm_task = asyncio.create_task(prewarm())
+    
+    async def execute_batch(self, job: Job, job_dir: Path, deadline: JobDeadline,
+                            resumed: Dict[int, Dict]) -> List[Dict]:
+        """Run all of a job's tools in one msfconsole boot and split the output per tool"""
+        # Planner stages give a dependency-respecting serial order
+        plan = plan_job(job.tools, job.target)
+        order = sorted(plan, key=lambda node: node.stage)
+        sections = []
+        results = {}
+        threads = {}
+        timeout = 0.0
+        for node in order:
+            if node.shares_run_of is not None or node.index in resumed:
+                continue
+            cached = None if job.force_refresh else self.result_cache.get(node.name, job.target, node.config)
+            if cached:
+                results[node.index] = cached
+                continue
+            module = MODULE_MAPPING.get(node.name)
+            if not module:
+                results[node.index] = {"error": f"Unknown tool: {node.name}"}
+                continue
+            # No per-section timing in a batch, so choose THREADS without feeding back
+            threads[node.index] = node.config.get("threads") or self.thread_tuner.choose(node.name, job.target)
+            config = {**node.config, "threads": threads[node.index]}
+            sections.append((node.index, build_module_commands(module, job.target, config)))
+            timeout += resolve_tool_timeout(node.name, job.target, history=self.runtime_history)
+        
+        if sections:
+            results.update(await self.run_batch_sections(job, job_dir, sections, timeout, deadline))
+            for index, _ in sections:
+                results[index]["threads"] = threads[index]
+                await self.attach_records(plan[index].name, results[index])
+                self.result_cache.put(plan[index].name, job.target, plan[index].config, results[index])
+        
+        for node in order:
+            if node.shares_run_of is not None and node.index not in resumed:
+                source = resumed.get(node.shares_run_of, {}).get("result") or results[node.shares_run_of]
+                results[node.index] = self.shared_result(source, plan[node.shares_run_of])
+        
+        entries = {
+            index: {"tool": plan[index].name, "timestamp": datetime.utcnow().isoformat(), "result": result}
+            for index, result in results.items()
+        }
+        await self.checkpoints.record_tools(job, entries)
+        return [resumed.get(node.index) or entries[node.index] for node in order]
+    
+    async def run_batch_sections(self, job: Job, job_dir: Path, sections: List, timeout: float,
+                                 deadline: JobDeadline) -> Dict[int, Dict]:
+        """Run compiled batch sections in a single msfconsole and demultiplex the results"""
+        resource_file = job_dir / "batch.rc"
+        output_file = job_dir / "batch_output.txt"
+        await write_text(resource_file, compile_batch_script(sections))
+        
+        return_code, stderr, error = None, "", None
+        try:
+            # The batch gets the sum of its tools' timeouts, capped by the job budget
+            return_code, stderr = await self.run_msfconsole(
+                resource_file, output_file, min(timeout, deadline.remaining()),
+                on_line=self.job_logs[job.id].writer("batch")
             )
+        except asyncio.TimeoutError:
+            error = "Tool execution timed out"
+        except Exception as e:
+            error = str(e)
+        
+        batch_output = await read_text(output_file)
+        await self.store_output(output_file, batch_output)
+        demuxed = demultiplex_output(batch_output)
+        results = {}
+        for index, _ in sections:
+            output, completed = demuxed.get(index, ("", False))
+            result = {
+                "success": completed and error is None,
+                "output": output,
+                "stderr": stderr,
+                "return_code": return_code,
+                "executor": "batch"
+            }
+            if not completed:
+                result["error"] = error or "Tool did not complete in batch run"
+            results[index] = result
+        
+        return results
+    
+    async def attach_records(self, tool_name: str, result: Dict) -> Dict:
+        """Parse a result's console output into typed records stored next to the raw text"""
+        module = MODULE_MAPPING.get(tool_name)
+        output = result.get("output") or ""
+        if not module or "records" in result:
+            return result
+        
+        if len(output) <= Config.PARSER_INLINE_MAX_BYTES:
+            records = parse_output(module, output)
+        else:
+            loop = asyncio.get_running_loop()
+            records = await loop.run_in_executor(self.parser_pool, parse_output, module, output)
+        result["records"] = records
+        return result
+    
+    async def attach_msf_db_rows(self, job_id: str, run: int, result: Dict) -> Dict:
+        """Attach the framework database rows a tool run recorded in its workspace"""
+        try:
+            result["msf_db"] = await self.msf_ingestor.ingest(job_id, run)
+        except Exception as e:
+            # Console output is still available; do not fail the tool over ingestion
+            result["msf_db_error"] = str(e)
+        return result
+    
+    async def store_output(self, output_file: Path, output: str):
+        """Write a tool's console output to the workspace, compressed when enabled"""
+        await store_text(output_file, output, self.output_codec, Config.OUTPUT_COMPRESSION_LEVEL)
+    
+    def shared_result(self, result: Dict, source: PlannedTool) -> Dict:
+        """Copy a module run's result for another tool that requested the same run"""
+        shared = dict(result)
+        shared["deduplicated_from"] = source.name
+        return shared
+    
+    def workspace_commands(self, workspace: str) -> List[str]:
+        """Console commands selecting a tool run's msf workspace in the framework database"""
+        commands = []
+        connected_at_boot = self.framework_cache.database_file and (not self.rpc_pool or Config.MSF_RPC_SPAWN)
+        if self.msf_database and not connected_at_boot:
+            # Not launched by us with MSF_DATABASE_CONFIG: connect from the console
+            commands.append(db_connect_command(self.msf_database))
+        commands.append(f"workspace -a {workspace}")
+        return commands
+    
+    async def execute_rpc_tool(self, commands: List[str], output_file: Path, timeout: float,
+                               on_line: Optional[Callable[[str], None]] = None) -> Dict:
+        """Run module commands in a console leased from the RPC worker pool"""
+        try:
+            async with self.rpc_pool.console() as console:
+                output = await console.run(commands, timeout=timeout, on_line=on_line)
             
-            # Read output
-            output = ""
-            if output_file.exists():
-                with open(output_file, 'r') as f:
-                    output = f.read()
+            # Keep the same workspace artifacts as the msfconsole path
+            await self.store_output(output_file, output)
             
             return {
-                "success": result.returncode == 0,
+                "success": True,
                 "output": output,
-                "stderr": result.stderr,
-                "return_code": result.returncode
+                "stderr": "",
+                "executor": "rpc",
+                "timeout": timeout
             }
             
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {
                 "success": False,
-                "error": "Tool execution timed out",
+                "error": f"Tool execution timed out after {int(timeout)}s",
                 "output": ""
             }
         except Exception as e:
@@ -514,8 +1118,65 @@ class MetasploitReconBackend:
                 "output": ""
             }
 
+    async def execute_remote_tool(self, tool_name: str, target: str, config: Dict, job_dir: Path,
+                                  timeout: float, file_stem: Optional[str],
+                                  on_line: Optional[Callable[[str], None]],
+                                  workspace: Optional[str]) -> Dict:
+        """Queue a tool run for a worker node and wait for its result"""
+        task_id = await self.task_queue.submit({
+            "job_id": job_dir.name,
+            "tool": tool_name,
+            "target": target,
+            "config": config,
+            "timeout": timeout,
+            "file_stem": file_stem,
+            "workspace": workspace
+        }, ttl=Config.TASK_QUEUE_TIMEOUT + Config.TASK_MAX_ATTEMPTS * (timeout + 2 * Config.TASK_LEASE_SECONDS))
+        
+        # The tool's timeout runs from the latest claim, plus a lease expiry to notice
+        # a dead worker; until a worker claims it, the task may wait in the queue
+        give_up_at = time.monotonic() + Config.TASK_QUEUE_TIMEOUT
+        started = False
+        try:
+            while time.monotonic() < give_up_at:
+                for event in await self.task_queue.next_events(task_id, timeout=5):
+                    if event["kind"] == "started":
+                        # Also sent again when a requeued task is claimed by another worker
+                        started = True
+                        give_up_at = time.monotonic() + timeout + 2 * Config.TASK_LEASE_SECONDS
+                    elif event["kind"] == "line":
+                        if on_line:
+                            on_line(event["line"])
+                    else:
+                        result = event["result"]
+                        result["executor"] = "remote"
+                        await self.task_queue.cleanup(task_id)
+                        return result
+            
+            await self.task_queue.request_cancel(task_id)
+            return {
+                "success": False,
+                "error": (f"No worker result after {int(timeout)}s" if started
+                          else f"No worker claimed the task within {Config.TASK_QUEUE_TIMEOUT}s"),
+                "output": ""
+            }
+        except asyncio.CancelledError:
+            await self.task_queue.request_cancel(task_id)
+            raise
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "output": ""
+            }
+
 def main():
     """Main entry point"""
+    if sys.argv[1:2] == ["worker"]:
+        from worker import run_worker
+        run_worker()
+        return
+    
     backend = MetasploitReconBackend()
     
     # Run the FastAPI application
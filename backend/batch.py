@@ -0,0 +1,58 @@
+"""
+Batched resource scripts for Metasploit Recon Backend
+Compiles all of a job's tools into one resource script so the framework boots
+once per job, then splits the combined console output back into per-tool output
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+MARKER_PREFIX = "[MSFRECON]"
+MARKER_PATTERN = re.compile(r"^\[MSFRECON\] (BEGIN|END) (\d+)\s*$")
+
+
+def _marker(kind: str, index: int) -> List[str]:
+    # Ruby blocks run inside the console, so the marker lands in the spooled output
+    return [
+        "<ruby>",
+        f'print_line("{MARKER_PREFIX} {kind} {index}")',
+        "</ruby>"
+    ]
+
+
+def compile_batch_script(sections: List[Tuple[int, List[str]]]) -> str:
+    """Build one resource script from (index, module commands) sections"""
+    lines = []
+    for index, commands in sections:
+        lines.extend(_marker("BEGIN", index))
+        lines.extend(commands)
+        lines.append("back")
+        lines.extend(_marker("END", index))
+    lines.append("exit")
+    return '\n'.join(lines)
+
+
+def demultiplex_output(output: str) -> Dict[int, Tuple[str, bool]]:
+    """Split combined console output into {index: (output, completed)}"""
+    sections: Dict[int, Tuple[str, bool]] = {}
+    current = None
+    buffer: List[str] = []
+
+    for line in output.splitlines(keepends=True):
+        match = MARKER_PATTERN.match(line.strip())
+        if not match:
+            if current is not None:
+                buffer.append(line)
+            continue
+
+        kind, index = match.group(1), int(match.group(2))
+        if kind == "BEGIN":
+            current, buffer = index, []
+        elif current == index:
+            sections[index] = (''.join(buffer), True)
+            current, buffer = None, []
+
+    # The framework died or timed out part-way through this section
+    if current is not None:
+        sections[current] = (''.join(buffer), False)
+    return sections
@@ -0,0 +1,99 @@
+"""
+Job checkpoints for Metasploit Recon Backend
+The job and its completed tool results are written to
+workspace/<job_id>/checkpoint.json after every finished tool, so unfinished
+jobs can resume after a restart from the first unfinished tool. Tool output
+already in the workspace (plain or compressed) is referenced rather than copied.
+"""
+
+import asyncio
+import json
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from compression import read_stored_text, stored_size
+from workspace import replace_text
+
+CHECKPOINT_FILE = "checkpoint.json"
+RESUMABLE_STATUSES = ("pending", "running")
+
+
+def _job_fields(job: Any) -> Dict[str, Any]:
+    # Results are checkpointed per tool; shard progress is rebuilt on resume
+    skipped = ("results", "progress", "version")
+    return {f.name: getattr(job, f.name) for f in fields(job) if f.name not in skipped}
+
+
+def _scan(workspace_dir: Path) -> List[Dict[str, Any]]:
+    checkpoints = []
+    for path in workspace_dir.glob(f"*/{CHECKPOINT_FILE}"):
+        try:
+            checkpoints.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue  # unreadable checkpoint: the job cannot be resumed
+    return checkpoints
+
+
+class JobCheckpointer:
+    """Per-job checkpoint files plus the completed tool results of resumed jobs"""
+
+    def __init__(self, workspace_dir: Path):
+        self.workspace_dir = workspace_dir
+        self.completed: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+    def _compact(self, job_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace the output with a reference when the workspace output file holds exactly it"""
+        result = entry["result"]
+        output = result.get("output")
+        output_file = self.workspace_dir / job_id / f"{result.get('output_name') or entry['tool']}_output.txt"
+        try:
+            if output and stored_size(output_file) == len(output.encode()):
+                result = {key: value for key, value in result.items() if key != "output"}
+                result["output_file"] = output_file.name
+        except OSError:
+            pass
+        return {**entry, "result": result}
+
+    async def _expand(self, job_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        result = dict(entry["result"])
+        output_file = result.pop("output_file", None)
+        if output_file:
+            result["output"] = await read_stored_text(self.workspace_dir / job_id / output_file)
+        return {**entry, "result": result}
+
+    async def save(self, job: Any):
+        """Write the job's current state and completed tools atomically"""
+        async with self.locks.setdefault(job.id, asyncio.Lock()):
+            completed = self.completed.get(job.id, {})
+            data = {
+                "job": _job_fields(job),
+                "completed": {str(index): self._compact(job.id, entry) for index, entry in completed.items()}
+            }
+            await replace_text(self.workspace_dir / job.id / CHECKPOINT_FILE, json.dumps(data, default=str))
+
+    async def record_tools(self, job: Any, entries: Dict[int, Dict[str, Any]]):
+        """Checkpoint finished tools, keyed by plan index"""
+        self.completed.setdefault(job.id, {}).update(entries)
+        await self.save(job)
+
+    async def load_unfinished(self) -> List[Tuple[Dict[str, Any], Dict[int, Dict[str, Any]]]]:
+        """Job fields and completed tool results of every job that had not finished"""
+        unfinished = []
+        for data in await asyncio.to_thread(_scan, self.workspace_dir):
+            job_fields = data["job"]
+            if job_fields.get("status") not in RESUMABLE_STATUSES:
+                continue
+            completed = {
+                int(index): await self._expand(job_fields["id"], entry)
+                for index, entry in data.get("completed", {}).items()
+            }
+            self.completed[job_fields["id"]] = dict(completed)
+            unfinished.append((job_fields, completed))
+        return unfinished
+
+    def forget(self, job_id: str):
+        """Drop per-job state once the job has finished"""
+        self.completed.pop(job_id, None)
+        self.locks.pop(job_id, None)
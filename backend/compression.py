@@ -0,0 +1,219 @@
+"""
+Compressed output storage for Metasploit Recon Backend
+Tool outputs are stored as independently compressed chunks (zstd frames, or
+gzip members when zstandard is not installed) followed by a JSON frame index
+in a frame that decompresses to nothing, so any byte range is decompressed
+without reading the whole file and a single rename publishes frames and index
+together. The files are still valid .zst/.gz files for command-line tools.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import struct
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from workspace import write_text
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # gzip from the standard library is used instead
+
+CHUNK_SIZE = 256 * 1024  # uncompressed bytes per frame
+CODEC_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+LEGACY_INDEX_SUFFIX = ".idx"  # indexes were once stored beside the frames
+
+FOOTER_MAGIC = b"RIDX"
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A5E
+GZIP_COMMENT_HEADER = b"\x1f\x8b\x08\x10\x00\x00\x00\x00\x00\xff"  # FCOMMENT, no mtime
+GZIP_EMPTY_TAIL = b"\x00\x03\x00" + bytes(8)  # comment end, empty deflate block, CRC32 and ISIZE of nothing
+FOOTER_PADDING = {"zstd": 0, "gzip": len(GZIP_EMPTY_TAIL)}  # bytes after the index payload
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard else "gzip"
+
+
+def compress_chunk(codec: str, data: bytes, level: int) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def decompress_chunk(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _index_frame(codec: str, index: Dict[str, Any]) -> bytes:
+    """The frame index as a trailing frame that decompresses to nothing
+
+    The payload ends with its length and FOOTER_MAGIC, so readers find it from
+    the end of the file: a zstd skippable frame, or an empty gzip member
+    carrying it as the member comment.
+    """
+    data = json.dumps(index).encode()
+    payload = data + b"%010d" % len(data) + FOOTER_MAGIC
+    if codec == "zstd":
+        return struct.pack("<II", ZSTD_SKIPPABLE_MAGIC, len(payload)) + payload
+    return GZIP_COMMENT_HEADER + payload + GZIP_EMPTY_TAIL
+
+
+def _read_index(f: BinaryIO, codec: str) -> Optional[Dict[str, Any]]:
+    """The frame index at the end of an open stored file; None if it has none"""
+    end = os.fstat(f.fileno()).st_size - FOOTER_PADDING[codec]
+    tail = len(FOOTER_MAGIC) + 10
+    if end < tail:
+        return None
+    f.seek(end - tail)
+    trailer = f.read(tail)
+    if not trailer.endswith(FOOTER_MAGIC) or not trailer[:10].isdigit():
+        return None
+    length = int(trailer[:10])
+    if length > end - tail:
+        return None
+    f.seek(end - tail - length)
+    try:
+        return json.loads(f.read(length))
+    except ValueError:
+        return None
+
+
+def _legacy_index(stored: Path) -> Optional[Dict[str, Any]]:
+    """The .idx file that older versions wrote beside the frames"""
+    try:
+        return json.loads(stored.with_name(stored.name + LEGACY_INDEX_SUFFIX).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _open_stored(path: Path) -> Optional[Tuple[Path, BinaryIO, Optional[Dict[str, Any]]]]:
+    """Open what is stored for a plain path; the frames read through the file match its index"""
+    for codec, suffix in CODEC_SUFFIXES.items():
+        stored = path.with_name(path.name + suffix)
+        try:
+            f = open(stored, 'rb')
+        except FileNotFoundError:
+            continue
+        index = _read_index(f, codec) or _legacy_index(stored)
+        if index is None:
+            # Without its index the compressed file is incomplete
+            f.close()
+            continue
+        return stored, f, index
+    try:
+        return path, open(path, 'rb'), None
+    except FileNotFoundError:
+        return None
+
+
+def find_stored(path: Path) -> Optional[Tuple[Path, Optional[Dict[str, Any]]]]:
+    """The compressed file stored for a plain path and its frame index, or the plain file itself"""
+    opened = _open_stored(path)
+    if opened is None:
+        return None
+    stored, f, index = opened
+    f.close()
+    return stored, index
+
+
+def stored_size(path: Path) -> Optional[int]:
+    """Uncompressed size of what is stored for a plain path; None if nothing is"""
+    opened = _open_stored(path)
+    if opened is None:
+        return None
+    _, f, index = opened
+    with f:
+        return index["size"] if index else os.fstat(f.fileno()).st_size
+
+
+def disk_size(path: Path) -> int:
+    """Bytes on disk of what is stored for a plain path"""
+    opened = _open_stored(path)
+    if opened is None:
+        return 0
+    _, f, _ = opened
+    with f:
+        return os.fstat(f.fileno()).st_size
+
+
+def write_compressed(path: Path, data: bytes, codec: str, level: int):
+    """Store data for a plain path as indexed frames, replacing any plain copy"""
+    stored = path.with_name(path.name + CODEC_SUFFIXES[codec])
+    # Unique per write: the same tool can be stored by several runs at once
+    tmp = stored.with_name(f"{stored.name}.{uuid.uuid4().hex[:12]}.tmp")
+    frames = []
+    offset = 0
+    try:
+        with open(tmp, 'wb') as f:
+            for start in range(0, len(data), CHUNK_SIZE):
+                frame = compress_chunk(codec, data[start:start + CHUNK_SIZE], level)
+                f.write(frame)
+                frames.append([offset, len(frame)])
+                offset += len(frame)
+            index = {"codec": codec, "chunk_size": CHUNK_SIZE, "size": len(data), "frames": frames}
+            f.write(_index_frame(codec, index))
+        # Frames and index are published together
+        os.replace(tmp, stored)
+    finally:
+        tmp.unlink(missing_ok=True)
+    stored.with_name(stored.name + LEGACY_INDEX_SUFFIX).unlink(missing_ok=True)
+    # e.g. the console spool msfconsole wrote
+    path.unlink(missing_ok=True)
+
+
+def iter_range(path: Path, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """Uncompressed bytes [start, end) of what is stored for a plain path, one frame at a time"""
+    opened = _open_stored(path)
+    if opened is None:
+        raise FileNotFoundError(path)
+    _, f, index = opened
+    with f:
+        size = index["size"] if index else os.fstat(f.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return
+
+        if index is None:
+            f.seek(start)
+            while start < end:
+                data = f.read(min(CHUNK_SIZE, end - start))
+                if not data:
+                    return
+                start += len(data)
+                yield data
+            return
+
+        chunk_size = index["chunk_size"]
+        for i in range(start // chunk_size, (end - 1) // chunk_size + 1):
+            offset, length = index["frames"][i]
+            f.seek(offset)
+            data = decompress_chunk(index["codec"], f.read(length))
+            chunk_start = i * chunk_size
+            yield data[max(start - chunk_start, 0):end - chunk_start]
+
+
+def read_stored(path: Path) -> bytes:
+    return b"".join(iter_range(path))
+
+
+async def store_text(path: Path, text: str, codec: Optional[str], level: int):
+    """Write text for a plain path, compressed unless codec is None, without blocking the event loop"""
+    if codec is None:
+        await write_text(path, text)
+    else:
+        await asyncio.to_thread(write_compressed, path, text.encode(), codec, level)
+
+
+async def read_stored_text(path: Path) -> str:
+    """Read back what is stored for a plain path without blocking the event loop; missing reads as empty"""
+    try:
+        data = await asyncio.to_thread(read_stored, path)
+    except FileNotFoundError:
+        return ""
+    return data.decode(errors='replace')
@@ -0,0 +1,124 @@
+"""
+Persistent framework cache for Metasploit Recon Backend
+The container root and the framework install are read-only, so the framework
+cannot keep its bootsnap, module metadata or config caches between launches.
+Every launch is pointed at one writable cache directory, warmed at startup,
+and cold versus warm boot times are recorded there.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from processes import sweep_process_group, terminate_process_group
+from workspace import replace_text
+
+BENCHMARK_FILE = "boot-benchmark.json"
+
+
+class FrameworkCache:
+    """Writable cache directory shared by every msfconsole/msfrpcd launch"""
+
+    def __init__(self, cache_dir: Path, database: Optional[Dict[str, Any]] = None):
+        self.cache_dir = Path(cache_dir)
+        # Framework database settings (framework_database_config), written to database.yml
+        self.database = database
+        self.database_file: Optional[Path] = None
+        self.writable = False
+        self.benchmark: Dict[str, Any] = {}
+
+    def prepare(self) -> bool:
+        """Create the directory layout; False (framework defaults) if it is not writable"""
+        try:
+            (self.cache_dir / ".msf4").mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / "bootsnap").mkdir(exist_ok=True)
+            probe = self.cache_dir / ".write-test"
+            probe.write_text("")
+            probe.unlink()
+            self.writable = True
+        except OSError:
+            self.writable = False
+            return False
+
+        if self.database:
+            self.database_file = self._write_database_file()
+
+        try:
+            benchmark = json.loads((self.cache_dir / BENCHMARK_FILE).read_text())
+        except (OSError, ValueError):
+            benchmark = None  # missing, or cut short by a crash: measured again by prewarm
+        self.benchmark = benchmark if isinstance(benchmark, dict) else {}
+        return True
+
+    def _write_database_file(self) -> Path:
+        """database.yml in the cache dir; HOME points here, so ~/.msf4 is not the operator's"""
+        path = self.cache_dir / ".msf4" / "database.yml"
+        # JSON scalars are valid YAML, and quote passwords with YAML-special characters
+        lines = ["production:"] + [f"  {key}: {json.dumps(value)}" for key, value in self.database.items()]
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def env(self) -> Optional[Dict[str, str]]:
+        """Environment for framework launches; None keeps the inherited one"""
+        if not self.writable:
+            return None
+        env = dict(os.environ)
+        # ~/.msf4 holds the module metadata cache, logs and history
+        env["HOME"] = str(self.cache_dir)
+        env["MSF_CFGROOT_CONFIG"] = str(self.cache_dir / ".msf4")
+        env["BOOTSNAP_CACHE_DIR"] = str(self.cache_dir / "bootsnap")
+        if self.database_file:
+            # Connected to the framework database at boot
+            env["MSF_DATABASE_CONFIG"] = str(self.database_file)
+        return env
+
+    async def time_boot(self, msfconsole_path: str, timeout: float) -> Optional[float]:
+        """Seconds for msfconsole to load and exit; None if it failed or timed out"""
+        started = time.monotonic()
+        process = await asyncio.create_subprocess_exec(
+            msfconsole_path, "-q", "-x", "exit",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=self.env(),
+            start_new_session=True
+        )
+        try:
+            await asyncio.wait_for(process.wait(), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            await terminate_process_group(process)
+            raise
+        finally:
+            sweep_process_group(process)
+        if process.returncode != 0:
+            return None
+        return round(time.monotonic() - started, 2)
+
+    async def prewarm(self, msfconsole_path: str, timeout: float = 600) -> Dict[str, Any]:
+        """Boot the framework into the cache; the first boot into an empty cache is the cold one"""
+        if not self.writable:
+            return self.benchmark
+        self.benchmark.pop("error", None)
+        try:
+            if self.benchmark.get("cold_boot_seconds") is None:
+                self.benchmark["cold_boot_seconds"] = await self.time_boot(msfconsole_path, timeout)
+            self.benchmark["warm_boot_seconds"] = await self.time_boot(msfconsole_path, timeout)
+        except asyncio.TimeoutError:
+            self.benchmark["error"] = f"Framework boot timed out after {int(timeout)}s"
+        except OSError as e:
+            self.benchmark["error"] = str(e)
+        self.benchmark["measured_at"] = datetime.utcnow().isoformat()
+        await replace_text(self.cache_dir / BENCHMARK_FILE, json.dumps(self.benchmark))
+        return self.benchmark
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "cache_dir": str(self.cache_dir),
+            "writable": self.writable,
+            **self.benchmark
+        }
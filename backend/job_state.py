@@ -0,0 +1,72 @@
+"""
+Job state for Metasploit Recon Backend
+A job's mutable state belongs to its writers, which serialize on a per-job
+lock and publish an immutable, versioned snapshot after every transition.
+Readers only look at the latest published snapshot and never take a lock.
+"""
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class JobSnapshot:
+    """A job as of one published version"""
+    id: str
+    target: str
+    profile_name: str
+    tools: Tuple[Dict[str, Any], ...]
+    status: str
+    created_at: str
+    started_at: Optional[str]
+    completed_at: Optional[str]
+    results: Tuple[Dict[str, Any], ...]
+    error: Optional[str]
+    user: str
+    priority: int
+    progress: Optional[Dict[str, Dict[str, int]]]
+    force_refresh: bool
+    version: int
+
+
+def take_snapshot(job: Any, version: int) -> JobSnapshot:
+    """Copy a job's fields; result entries are never modified once recorded"""
+    return JobSnapshot(
+        id=job.id,
+        target=job.target,
+        profile_name=job.profile_name,
+        tools=tuple(job.tools),
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+        results=tuple(job.results or ()),
+        error=job.error,
+        user=job.user,
+        priority=job.priority,
+        progress={name: dict(counts) for name, counts in job.progress.items()} if job.progress else None,
+        force_refresh=job.force_refresh,
+        version=version
+    )
+
+
+class JobState:
+    """A job's writer-side state and its latest published snapshot"""
+
+    def __init__(self, job: Any, on_publish: Optional[Callable[[JobSnapshot], None]] = None):
+        self.job = job
+        self.on_publish = on_publish
+        self.lock = threading.Lock()
+        self.snapshot = take_snapshot(job, 0)
+
+    @contextmanager
+    def update(self) -> Iterator[Any]:
+        """Mutate the job under its lock, then publish the next version"""
+        with self.lock:
+            yield self.job
+            # One reference swap: readers see either the old or the new version
+            self.snapshot = take_snapshot(self.job, self.snapshot.version + 1)
+            if self.on_publish:
+                self.on_publish(self.snapshot)
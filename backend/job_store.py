@@ -0,0 +1,496 @@
+"""
+Persistent job store for Metasploit Recon Backend
+Jobs, tool results and timestamps live in SQLite (WAL mode). Writes are
+buffered and coalesced per job, then flushed in one transaction per batch;
+reads go straight to indexed queries, overlaid with not-yet-flushed writes.
+Only pending and running jobs are kept in memory by the application.
+"""
+
+import asyncio
+import base64
+import ipaddress
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    target TEXT NOT NULL,
+    profile_name TEXT NOT NULL,
+    user TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    force_refresh INTEGER NOT NULL DEFAULT 0,
+    tools TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    completed_at TEXT,
+    error TEXT,
+    results_count INTEGER NOT NULL DEFAULT 0,
+    target_start TEXT,
+    target_end TEXT,
+    results_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    tool TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+) WITHOUT ROWID;
+"""
+# Created after migrating older stores; each filter index ends in the listing key
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_target ON jobs (target, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_profile ON jobs (profile_name, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs (user, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_target_range ON jobs (target_start, target_end);
+"""
+SCHEMA_VERSION = 2
+# CIDR filters matching fewer stored jobs than this are served from the range index
+RANGE_INDEX_MAX_ROWS = 5000
+
+JOB_COLUMNS = (
+    "id", "target", "profile_name", "user", "status", "priority", "force_refresh",
+    "tools", "created_at", "started_at", "completed_at", "error", "results_count",
+    "target_start", "target_end", "results_bytes"
+)
+UPSERT_JOB = (
+    f"INSERT INTO jobs ({', '.join(JOB_COLUMNS)}) VALUES ({', '.join('?' for _ in JOB_COLUMNS)}) "
+    "ON CONFLICT(id) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in JOB_COLUMNS if column != "id")
+)
+# Columns of the API status view; every state change rewrites them in the row
+STATUS_COLUMNS = (
+    "id", "target", "profile_name", "status", "created_at", "started_at",
+    "completed_at", "error", "results_count"
+)
+INSERT_RESULT = "INSERT OR REPLACE INTO job_results (job_id, seq, tool, timestamp, result) VALUES (?, ?, ?, ?, ?)"
+# Finished jobs, oldest first, for retention
+PRUNE_JOBS = """
+    SELECT id, results_bytes FROM jobs
+    WHERE status NOT IN ('pending', 'running')
+    ORDER BY created_at
+"""
+
+
+def sqlite_path(database_url: str) -> str:
+    if not database_url.startswith("sqlite:///"):
+        raise ValueError(f"Unsupported job database URL: {database_url}")
+    return database_url[len("sqlite:///"):]
+
+
+def _address_key(address: Any) -> str:
+    # IPv4 is mapped into the IPv6 space so one fixed-width text column sorts both
+    value = int(address)
+    if address.version == 4:
+        value |= 0xFFFF << 32
+    return f"{value:032x}"
+
+
+@lru_cache(maxsize=4096)
+def target_range(target: str) -> Tuple[Optional[str], Optional[str]]:
+    """First and last address of an IP or CIDR target as sortable keys; (None, None) for hostnames"""
+    try:
+        network = ipaddress.ip_network(target.strip(), strict=False)
+    except ValueError:
+        return None, None
+    return _address_key(network.network_address), _address_key(network.broadcast_address)
+
+
+@dataclass
+class JobFilter:
+    """Listing filters, each backed by an index on the jobs table"""
+    status: Optional[str] = None
+    target: Optional[str] = None  # exact target, or a CIDR whose contained targets match
+    profile_name: Optional[str] = None
+    user: Optional[str] = None
+    created_after: Optional[str] = None
+    created_before: Optional[str] = None
+
+    def __post_init__(self):
+        self.network: Optional[Tuple[str, str]] = None
+        if self.target is not None and "/" in self.target:
+            start, end = target_range(self.target)
+            if start is None:
+                raise ValueError(f"Invalid CIDR target filter: {self.target}")
+            self.network = (start, end)
+        for bound in (self.created_after, self.created_before):
+            if bound is not None:
+                datetime.fromisoformat(bound)  # ValueError for anything else
+
+    @property
+    def active(self) -> bool:
+        return any(value is not None for value in (
+            self.status, self.target, self.profile_name, self.user, self.created_after, self.created_before
+        ))
+
+    def where(self, range_index: bool = True) -> Tuple[List[str], List[Any]]:
+        """SQL conditions and parameters; range_index=False filters CIDR matches while walking the listing order"""
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column in ("status", "profile_name", "user"):
+            if getattr(self, column) is not None:
+                clauses.append(f"{column} = ?")
+                params.append(getattr(self, column))
+        if self.network:
+            start, end = self.network
+            if range_index:
+                # Bounded on both sides so the range index is used
+                clauses.append("target_start BETWEEN ? AND ? AND target_end <= ?")
+            else:
+                # "+" keeps the range index out: the listing index is walked newest
+                # first and the scan stops at the page limit
+                clauses.append("+target_start BETWEEN ? AND ? AND target_end <= ?")
+            params.extend((start, end, end))
+        elif self.target is not None:
+            clauses.append("target = ?")
+            params.append(self.target)
+        if self.created_after is not None:
+            clauses.append("created_at >= ?")
+            params.append(self.created_after)
+        if self.created_before is not None:
+            clauses.append("created_at < ?")
+            params.append(self.created_before)
+        return clauses, params
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        """The same conditions, for rows not yet written"""
+        for column in ("status", "profile_name", "user"):
+            if getattr(self, column) is not None and row[column] != getattr(self, column):
+                return False
+        if self.network:
+            if row["target_start"] is None or not (
+                    row["target_start"] >= self.network[0] and row["target_end"] <= self.network[1]):
+                return False
+        elif self.target is not None and row["target"] != self.target:
+            return False
+        if self.created_after is not None and row["created_at"] < self.created_after:
+            return False
+        if self.created_before is not None and row["created_at"] >= self.created_before:
+            return False
+        return True
+
+
+def job_key(row: Dict[str, Any]) -> Tuple[str, str]:
+    """Listing order key: creation time, ties broken by id"""
+    return row["created_at"], row["id"]
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just past a listed row"""
+    return base64.urlsafe_b64encode("|".join(job_key(row)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, job_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return created_at, job_id
+
+
+def status_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """API status view of a stored job"""
+    view = {column: row[column] for column in STATUS_COLUMNS}
+    view.update(queue_position=None, eta_seconds=None, progress=None)
+    return view
+
+
+def job_row(job: Any) -> Dict[str, Any]:
+    """Storage row for a Job"""
+    return {
+        "id": job.id,
+        "target": job.target,
+        "profile_name": job.profile_name,
+        "user": job.user,
+        "status": job.status,
+        "priority": job.priority,
+        "force_refresh": int(job.force_refresh),
+        "tools": json.dumps(job.tools),
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "completed_at": job.completed_at,
+        "error": job.error,
+        "results_count": len(job.results) if job.results else 0,
+        **dict(zip(("target_start", "target_end"), target_range(job.target))),
+        # Tool output spilled to the workspace, counted against the storage budget
+        "results_bytes": sum(entry["result"].get("spilled", {}).get("bytes", 0) for entry in job.results or ())
+    }
+
+
+class JobStore:
+    """SQLite-backed job history with write-behind batching"""
+
+    def __init__(self, path: str, max_jobs: int, flush_interval: float = 0.2,
+                 max_bytes: Optional[int] = None,
+                 on_expire: Optional[Callable[[List[str]], None]] = None):
+        self.max_jobs = max_jobs
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        # Called from the writer thread with the ids of jobs dropped by retention
+        self.on_expire = on_expire
+
+        # One connection writes (in a worker thread); reads run in worker threads
+        # too, each on its own connection. WAL lets readers see the last committed
+        # batch while a flush runs
+        self.path = path
+        self.writer = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.writer.execute("PRAGMA journal_mode=WAL")
+        self.writer.execute("PRAGMA synchronous=NORMAL")
+        self.writer.executescript(SCHEMA)
+        self._migrate()
+        self.writer.executescript(INDEXES)
+        self.local = threading.local()
+        self.readers: List[sqlite3.Connection] = []
+
+        self.total, self.total_bytes = self.writer.execute(
+            "SELECT COUNT(*), COALESCE(SUM(results_bytes), 0) FROM jobs"
+        ).fetchone()
+        # Buffered writes: latest row per job, result rows, and jobs not yet in the table
+        self.dirty: Dict[str, Dict[str, Any]] = {}
+        self.flushing: Dict[str, Dict[str, Any]] = {}
+        self.unflushed_new: Dict[str, Dict[str, Any]] = {}
+        self.pending_results: List[Tuple] = []
+        self.buffered_results: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.buffer_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _migrate(self):
+        version = self.writer.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        self.writer.execute("BEGIN")
+        columns = {row[1] for row in self.writer.execute("PRAGMA table_info(jobs)")}
+        if "target_start" not in columns:
+            # Stores from before CIDR filtering: add and backfill the target address range
+            self.writer.execute("ALTER TABLE jobs ADD COLUMN target_start TEXT")
+            self.writer.execute("ALTER TABLE jobs ADD COLUMN target_end TEXT")
+            self.writer.create_function("range_start", 1, lambda target: target_range(target)[0])
+            self.writer.create_function("range_end", 1, lambda target: target_range(target)[1])
+            self.writer.execute("UPDATE jobs SET target_start = range_start(target), target_end = range_end(target)")
+        if "results_bytes" not in columns:
+            # Results recorded before spilling kept their output inline
+            self.writer.execute("ALTER TABLE jobs ADD COLUMN results_bytes INTEGER NOT NULL DEFAULT 0")
+        if version < 1:
+            # Replaced by indexes that end in the (created_at, id) listing key
+            for index in ("idx_jobs_created_at", "idx_jobs_status", "idx_jobs_target", "idx_jobs_user"):
+                self.writer.execute(f"DROP INDEX IF EXISTS {index}")
+        self.writer.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.writer.execute("COMMIT")
+
+    async def start(self):
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flusher:
+            self._flusher.cancel()
+        await self.flush()
+        # Refresh planner statistics, so filtered listings pick the most selective index
+        with self.write_lock:
+            self.writer.execute("PRAGMA optimize")
+        with self.buffer_lock:
+            readers, self.readers = self.readers, []
+        for reader in readers:
+            reader.close()
+        self.writer.close()
+
+    # Writes (buffered)
+
+    def put_job(self, job: Any, new: bool = False):
+        """Record the job's current state; consecutive updates are coalesced"""
+        row = job_row(job)
+        with self.buffer_lock:
+            self.dirty[job.id] = row
+            if new:
+                self.unflushed_new[job.id] = row
+                self.total += 1
+            elif job.id in self.unflushed_new:
+                self.unflushed_new[job.id] = row
+
+    def add_result(self, job_id: str, seq: int, entry: Dict[str, Any]):
+        with self.buffer_lock:
+            self.pending_results.append((
+                job_id, seq, entry["tool"], entry["timestamp"], json.dumps(entry["result"], default=str)
+            ))
+            self.buffered_results.setdefault(job_id, {})[seq] = entry
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except sqlite3.Error:
+                pass  # the batch was put back; retried on the next tick
+
+    async def flush(self):
+        """Write all buffered changes in one transaction"""
+        with self.buffer_lock:
+            # Rows being written stay readable from memory until they are committed
+            self.flushing = self.dirty
+            results = self.pending_results
+            flushed_new = list(self.unflushed_new)
+            self.dirty = {}
+            self.pending_results = []
+        try:
+            if self.flushing or results:
+                await asyncio.to_thread(self._write_batch, list(self.flushing.values()), results)
+        except sqlite3.Error:
+            with self.buffer_lock:
+                self.dirty = {**self.flushing, **self.dirty}
+                self.pending_results = results + self.pending_results
+                self.flushing = {}
+            raise
+        else:
+            with self.buffer_lock:
+                self.flushing = {}
+                for job_id in flushed_new:
+                    self.unflushed_new.pop(job_id, None)
+                for job_id, seq, *_ in results:
+                    buffered = self.buffered_results.get(job_id, {})
+                    buffered.pop(seq, None)
+                    if not buffered:
+                        self.buffered_results.pop(job_id, None)
+
+    def _write_batch(self, rows: List[Dict[str, Any]], results: List[Tuple]):
+        # A flush cancelled on shutdown may still be running in its thread
+        with self.write_lock:
+            expired = self._write_transaction(rows, results)
+        if expired and self.on_expire:
+            self.on_expire(expired)
+
+    def _stored_bytes(self, job_ids: List[str]) -> int:
+        stored = 0
+        for i in range(0, len(job_ids), 500):
+            chunk = job_ids[i:i + 500]
+            stored += self.writer.execute(
+                f"SELECT COALESCE(SUM(results_bytes), 0) FROM jobs WHERE id IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            ).fetchone()[0]
+        return stored
+
+    def _expired_jobs(self, total_bytes: int) -> List[Tuple[str, int]]:
+        """Oldest finished jobs to drop so both the job and the byte limits hold"""
+        excess_jobs = self.total - self.max_jobs
+        excess_bytes = total_bytes - self.max_bytes if self.max_bytes is not None else 0
+        expired: List[Tuple[str, int]] = []
+        freed = 0
+        if excess_jobs <= 0 and excess_bytes <= 0:
+            return expired
+        for job_id, size in self.writer.execute(PRUNE_JOBS):
+            if len(expired) >= excess_jobs and freed >= excess_bytes:
+                break
+            expired.append((job_id, size))
+            freed += size
+        return expired
+
+    def _write_transaction(self, rows: List[Dict[str, Any]], results: List[Tuple]) -> List[str]:
+        self.writer.execute("BEGIN")
+        try:
+            added_bytes = sum(row["results_bytes"] for row in rows) - self._stored_bytes([row["id"] for row in rows])
+            self.writer.executemany(UPSERT_JOB, [tuple(row[column] for column in JOB_COLUMNS) for row in rows])
+            self.writer.executemany(INSERT_RESULT, results)
+            expired = self._expired_jobs(self.total_bytes + added_bytes)
+            self.writer.executemany("DELETE FROM job_results WHERE job_id = ?", [(job_id,) for job_id, _ in expired])
+            self.writer.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id, _ in expired])
+            self.writer.execute("COMMIT")
+        except Exception:
+            self.writer.execute("ROLLBACK")
+            raise
+        with self.buffer_lock:
+            self.total -= len(expired)
+            self.total_bytes += added_bytes - sum(size for _, size in expired)
+        return [job_id for job_id, _ in expired]
+
+    def status(self) -> Dict[str, Any]:
+        with self.buffer_lock:
+            return {
+                "stored_jobs": self.total,
+                "max_jobs": self.max_jobs,
+                "stored_result_bytes": self.total_bytes,
+                "max_result_bytes": self.max_bytes
+            }
+
+    # Reads (indexed, overlaid with the write buffer); they block, so callers on
+    # the event loop run them with asyncio.to_thread
+
+    def _reader(self) -> sqlite3.Connection:
+        reader = getattr(self.local, "reader", None)
+        if reader is None:
+            reader = sqlite3.connect(self.path, check_same_thread=False)
+            reader.row_factory = sqlite3.Row
+            self.local.reader = reader
+            with self.buffer_lock:
+                self.readers.append(reader)
+        return reader
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.buffer_lock:
+            row = self.dirty.get(job_id) or self.flushing.get(job_id)
+        if row is not None:
+            return row
+        found = self._reader().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(found) if found else None
+
+    def get_results(self, job_id: str) -> List[Dict[str, Any]]:
+        results = [
+            {"tool": row["tool"], "timestamp": row["timestamp"], "result": json.loads(row["result"])}
+            for row in self._reader().execute(
+                "SELECT tool, timestamp, result FROM job_results WHERE job_id = ? ORDER BY seq", (job_id,)
+            )
+        ]
+        with self.buffer_lock:
+            buffered = self.buffered_results.get(job_id, {})
+            return results + [buffered[seq] for seq in sorted(buffered)]
+
+    def list_jobs(self, limit: int, offset: int = 0, after: Optional[Tuple[str, str]] = None,
+                  filters: Optional[JobFilter] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Newest first by job_key; with `after`, the page that follows that key (offset is ignored).
+        The total is only known for unfiltered listings: counting filtered ones costs a scan"""
+        if limit < 1:
+            # SQLite reads LIMIT -1 as no limit at all
+            raise ValueError(f"Invalid page size: {limit}")
+        filters = filters or JobFilter()
+        with self.buffer_lock:
+            # The latest state of jobs written since the last commit replaces their stored row
+            changed = {**self.flushing, **self.dirty}
+            total = None if filters.active else self.total
+
+        reader = self._reader()
+        clauses, params = filters.where(range_index=filters.network is None or self._few_in_range(reader, filters.network))
+        if after is not None:
+            # Seek on the listing key: O(log N + limit) at any depth
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(after)
+            offset = 0
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        stored = reader.execute(
+            f"SELECT * FROM jobs {where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit + len(changed), offset)
+        ).fetchall()
+
+        live = [row for row in changed.values() if filters.matches(row) and (after is None or job_key(row) < after)]
+        if offset:
+            # Offset pages only take unwritten jobs that sort inside the stored page
+            live = [row for row in live if stored and job_key(row) <= job_key(stored[0])]
+        page = live + [dict(row) for row in stored if row["id"] not in changed]
+        page.sort(key=job_key, reverse=True)
+        return page[:limit], total
+
+    def _few_in_range(self, reader: sqlite3.Connection, network: Tuple[str, str]) -> bool:
+        """Whether few enough jobs fall inside a CIDR filter to sort them all"""
+        start, end = network
+        found = reader.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM jobs WHERE target_start BETWEEN ? AND ? AND target_end <= ? LIMIT ?)",
+            (start, end, end, RANGE_INDEX_MAX_ROWS)
+        ).fetchone()[0]
+        return found < RANGE_INDEX_MAX_ROWS
@@ -0,0 +1,86 @@
+"""
+Live job output log for Metasploit Recon Backend
+Append-only, sequence-numbered console lines so clients can poll for only
+the lines after the last sequence number they saw. Once a job has finished
+its log is replayed from the tool outputs stored in the job workspace.
+"""
+
+import itertools
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List
+
+from compression import iter_range
+
+OUTPUT_SUFFIX = "_output.txt"
+
+
+class JobLog:
+    """Bounded append-only log; sequence numbers keep increasing when old lines are dropped"""
+
+    def __init__(self, max_lines: int = 100000):
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=max_lines)
+        self.next_seq = 1
+
+    def append(self, tool: str, line: str):
+        self.entries.append({
+            "seq": self.next_seq,
+            "tool": tool,
+            "line": line,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        self.next_seq += 1
+
+    def writer(self, tool: str) -> Callable[[str], None]:
+        """Line callback that tags every line with the tool producing it"""
+        return lambda line: self.append(tool, line)
+
+    def read(self, after: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Entries with seq > after, oldest first"""
+        if not self.entries:
+            return []
+        first_seq = self.entries[0]["seq"]
+        start = max(0, after - first_seq + 1)
+        return list(itertools.islice(self.entries, start, start + limit))
+
+    def first_seq(self) -> int:
+        return self.entries[0]["seq"] if self.entries else self.next_seq
+
+
+def _stored_outputs(job_dir: Path) -> List[str]:
+    """Plain output file names in a job workspace, whether stored compressed or not"""
+    names = set()
+    for path in job_dir.glob(f"*{OUTPUT_SUFFIX}*"):
+        if not path.name.endswith(".tmp"):
+            names.add(path.name[:path.name.index(OUTPUT_SUFFIX) + len(OUTPUT_SUFFIX)])
+    return sorted(names)
+
+
+def _stored_lines(path: Path) -> Iterator[str]:
+    pending = b""
+    for chunk in iter_range(path):
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for raw in lines:
+            yield raw.decode(errors='replace').rstrip('\r')
+    if pending:
+        yield pending.decode(errors='replace').rstrip('\r')
+
+
+def read_stored_log(job_dir: Path, after: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+    """A finished job's log from its stored outputs, numbered one output file after another"""
+    entries = []
+    seq = 0
+    for name in _stored_outputs(job_dir):
+        try:
+            for line in _stored_lines(job_dir / name):
+                seq += 1
+                if seq <= after:
+                    continue
+                entries.append({"seq": seq, "tool": name[:-len(OUTPUT_SUFFIX)], "line": line, "timestamp": None})
+                if len(entries) >= limit:
+                    return entries
+        except FileNotFoundError:
+            continue  # expired with the job's workspace
+    return entries
@@ -0,0 +1,214 @@
+"""
+Module metadata cache for Metasploit Recon Backend
+Options, defaults and types of every mapped module, built once from the
+framework's module metadata store and module sources, persisted next to the
+framework cache and loaded lazily. Drives /api/tools and submission-time
+validation of tool config values.
+"""
+
+import asyncio
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tools import CONFIG_OPTIONS, MODULE_MAPPING
+from workspace import write_atomic
+
+# Options every mapped module gets from the Auxiliary::Scanner mixin
+SCANNER_OPTIONS = {
+    "RHOSTS": {"type": "address_range", "required": True, "default": None,
+               "description": "The target host(s)"},
+    "THREADS": {"type": "integer", "required": True, "default": 1,
+                "description": "The number of concurrent threads"}
+}
+
+OPT_TYPES = {
+    "Int": "integer",
+    "Float": "float",
+    "Port": "port",
+    "Bool": "bool",
+    "Enum": "enum",
+    "String": "string",
+    "Address": "address",
+    "AddressRange": "address_range",
+    "Path": "path",
+    "Regexp": "regexp"
+}
+
+# OptInt.new('TIMEOUT', [true, 'The socket connect timeout in milliseconds', 1000])
+OPTION_DECL = re.compile(
+    r"Opt(?P<type>\w+)\.new\(\s*['\"](?P<name>\w+)['\"]\s*,\s*\[\s*(?P<required>true|false)\s*,"
+    r"\s*(?P<q>['\"])(?P<desc>.*?)(?P=q)\s*"
+    r"(?:,\s*(?P<default>'[^']*'|\"[^\"]*\"|[\w.:\-]+))?"
+    r"(?:\s*,\s*\[(?P<enums>[^\]]*)\])?",
+    re.S
+)
+RPORT_DECL = re.compile(r"Opt::RPORT\(\s*(?P<port>\d+)\s*\)")
+PORT_LIST = re.compile(r"^\d+(?:-\d+)?(?:,\d+(?:-\d+)?)*$")
+
+
+def _ruby_literal(token: Optional[str]) -> Any:
+    if token is None or token == "nil":
+        return None
+    if token[:1] in ("'", '"'):
+        return token[1:-1]
+    if token in ("true", "false"):
+        return token == "true"
+    try:
+        return int(token)
+    except ValueError:
+        try:
+            return float(token)
+        except ValueError:
+            return token
+
+
+def parse_module_options(source: str) -> Dict[str, Dict[str, Any]]:
+    """Option declarations found in a module's Ruby source"""
+    options = {}
+    for m in RPORT_DECL.finditer(source):
+        options["RPORT"] = {"type": "port", "required": True, "default": int(m.group("port")),
+                            "description": "The target port"}
+    for m in OPTION_DECL.finditer(source):
+        option = {
+            "type": OPT_TYPES.get(m.group("type"), "string"),
+            "required": m.group("required") == "true",
+            "default": _ruby_literal(m.group("default")),
+            "description": m.group("desc")
+        }
+        if m.group("enums") is not None:
+            option["enums"] = [_ruby_literal(e.strip()) for e in m.group("enums").split(",") if e.strip()]
+        options[m.group("name")] = option
+    return options
+
+
+def check_option_value(name: str, option: Dict[str, Any], value: Any) -> Optional[str]:
+    """Why msfconsole would reject value for this option, or None if it is acceptable"""
+    kind = option["type"]
+    text = str(value).strip()
+    if option.get("required") and text == "":
+        return f"{name} is required"
+    if kind in ("integer", "port"):
+        if isinstance(value, bool) or not re.fullmatch(r"-?\d+", text):
+            return f"{name} must be an integer"
+        if kind == "port" and not 0 <= int(text) <= 65535:
+            return f"{name} must be a port number (0-65535)"
+        if name == "THREADS" and int(text) < 1:
+            return f"{name} must be at least 1"
+    elif kind == "float":
+        try:
+            float(text)
+        except ValueError:
+            return f"{name} must be a number"
+    elif kind == "bool":
+        if text.lower() not in ("true", "false", "yes", "no", "1", "0", "y", "n"):
+            return f"{name} must be a boolean"
+    elif kind == "enum":
+        if option.get("enums") and text not in [str(e) for e in option["enums"]]:
+            return f"{name} must be one of: {', '.join(str(e) for e in option['enums'])}"
+    elif name == "PORTS" and not PORT_LIST.match(text.replace(" ", "")):
+        return f"{name} must be a port list like 22-25,80,443"
+    return None
+
+
+class ModuleMetadataCache:
+    """Lazily loaded, persisted option metadata for the modules in MODULE_MAPPING"""
+
+    def __init__(self, msf_path: str, cache_file: Optional[Path] = None,
+                 store_files: Optional[List[Path]] = None):
+        self.msf_path = Path(msf_path)
+        self.cache_file = cache_file
+        # Framework metadata stores, user store first: fullname -> module path
+        self.store_files = store_files or [self.msf_path / "db" / "modules_metadata_base.json"]
+        self.modules: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self) -> Dict[str, Dict[str, Any]]:
+        if self.modules is None:
+            async with self._lock:
+                if self.modules is None:
+                    self.modules = await asyncio.to_thread(self._load)
+        return self.modules
+
+    def _source_stamp(self) -> float:
+        stamps = [path.stat().st_mtime for path in self.store_files if path.exists()]
+        return max(stamps, default=0.0)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        stamp = self._source_stamp()
+        if self.cache_file and self.cache_file.exists():
+            try:
+                saved = json.loads(self.cache_file.read_text())
+                # Rebuild after a framework update or when the module mapping changed
+                if saved.get("source_stamp") == stamp and set(saved["modules"]) == set(MODULE_MAPPING.values()):
+                    return saved["modules"]
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                pass  # unreadable or corrupt: rebuilt and rewritten below
+
+        modules = self._build()
+        if self.cache_file:
+            try:
+                write_atomic(self.cache_file, json.dumps({"source_stamp": stamp, "modules": modules}))
+            except OSError:
+                pass  # read-only: keep it in memory only
+        return modules
+
+    def _read_store(self) -> Dict[str, Dict[str, Any]]:
+        entries: Dict[str, Dict[str, Any]] = {}
+        for path in reversed(self.store_files):
+            if not path.exists():
+                continue
+            for entry in json.loads(path.read_text()).values():
+                if entry.get("fullname") in MODULE_MAPPING.values():
+                    entries[entry["fullname"]] = entry
+        return entries
+
+    def _build(self) -> Dict[str, Dict[str, Any]]:
+        store = self._read_store()
+        modules = {}
+        for fullname in set(MODULE_MAPPING.values()):
+            entry = store.get(fullname, {})
+            source_path = self.msf_path / (entry.get("path") or f"/modules/{fullname}.rb").lstrip("/")
+            options = dict(SCANNER_OPTIONS)
+            source = "builtin"
+            if source_path.exists():
+                options.update(parse_module_options(source_path.read_text(errors="replace")))
+                source = "framework"
+            modules[fullname] = {
+                "name": entry.get("name"),
+                "description": entry.get("description"),
+                "source": source,
+                "options": options
+            }
+        return modules
+
+    def catalog(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Tool catalog entries with their module's options attached"""
+        entries = []
+        for tool in tools:
+            module = MODULE_MAPPING.get(tool["name"])
+            metadata = self.modules.get(module, {}) if self.modules else {}
+            entries.append({
+                **tool,
+                "module": module,
+                "module_name": metadata.get("name"),
+                "module_options": metadata.get("options", {})
+            })
+        return entries
+
+    def validate(self, tool_name: str, config: Dict[str, Any]) -> List[str]:
+        """Problems with the tool name and the config values that are sent to the module"""
+        module = MODULE_MAPPING.get(tool_name)
+        if not module:
+            return [f"{tool_name}: unknown tool"]
+        if not self.modules or module not in self.modules:
+            return []
+        options = self.modules[module]["options"]
+        errors = []
+        for key, option_name in CONFIG_OPTIONS.items():
+            if key in config and option_name in options:
+                error = check_option_value(option_name, options[option_name], config[key])
+                if error:
+                    errors.append(f"{tool_name}: {key}: {error}")
+        return errors
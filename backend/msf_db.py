@@ -0,0 +1,189 @@
+"""
+Metasploit database ingestion for Metasploit Recon Backend
+Reads hosts, services, notes and vulns recorded by the framework for a job's
+msf workspace, instead of scraping them out of console text
+"""
+
+import asyncio
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote, urlsplit
+
+# Rows newer than the job's last-seen id, per table. host() renders inet
+# addresses as text on PostgreSQL; the SQLite backend registers the same name.
+QUERIES = {
+    "hosts": """
+        SELECT h.id, host(h.address) AS address, h.mac, h.name, h.state, h.os_name, h.os_flavor
+        FROM hosts h
+        WHERE h.workspace_id = $1 AND h.id > $2
+        ORDER BY h.id
+    """,
+    "services": """
+        SELECT s.id, host(h.address) AS address, s.port, s.proto, s.state, s.name, s.info
+        FROM services s JOIN hosts h ON h.id = s.host_id
+        WHERE h.workspace_id = $1 AND s.id > $2
+        ORDER BY s.id
+    """,
+    "notes": """
+        SELECT n.id, host(h.address) AS address, n.ntype, n.data
+        FROM notes n LEFT JOIN hosts h ON h.id = n.host_id
+        WHERE n.workspace_id = $1 AND n.id > $2
+        ORDER BY n.id
+    """,
+    "vulns": """
+        SELECT v.id, host(h.address) AS address, v.name, v.info
+        FROM vulns v JOIN hosts h ON h.id = v.host_id
+        WHERE h.workspace_id = $1 AND v.id > $2
+        ORDER BY v.id
+    """
+}
+WORKSPACE_QUERY = "SELECT id FROM workspaces WHERE name = $1"
+
+
+def framework_database_config(url: str, pool_size: int = 5) -> Optional[Dict[str, Any]]:
+    """database.yml settings for the framework itself; None for URLs it cannot use (it only speaks PostgreSQL)"""
+    if not url.startswith(("postgres://", "postgresql://")):
+        return None
+    parts = urlsplit(url)
+    return {
+        "adapter": "postgresql",
+        "database": parts.path.lstrip("/"),
+        "username": unquote(parts.username or ""),
+        "password": unquote(parts.password or ""),
+        "host": parts.hostname or "localhost",
+        "port": parts.port or 5432,
+        "pool": pool_size,
+        "timeout": 5
+    }
+
+
+def db_connect_command(config: Dict[str, Any]) -> str:
+    """msfconsole command connecting to the database in a framework database config"""
+    return (f"db_connect {config['username']}:{config['password']}"
+            f"@{config['host']}:{config['port']}/{config['database']}")
+
+
+class MsfDatabase(ABC):
+    """Pooled async access to the framework database"""
+
+    @staticmethod
+    def from_url(url: str, pool_size: int = 5) -> "MsfDatabase":
+        if url.startswith(("postgres://", "postgresql://")):
+            return PostgresMsfDatabase(url, pool_size)
+        if url.startswith("sqlite:///"):
+            return SqliteMsfDatabase(url[len("sqlite:///"):])
+        raise ValueError(f"Unsupported Metasploit database URL: {url}")
+
+    @abstractmethod
+    async def connect(self):
+        ...
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+    @abstractmethod
+    async def fetch(self, query: str, *args: Any) -> List[Dict[str, Any]]:
+        ...
+
+
+class PostgresMsfDatabase(MsfDatabase):
+    def __init__(self, url: str, pool_size: int):
+        self.url = url
+        self.pool_size = pool_size
+        self.pool = None
+
+    async def connect(self):
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise RuntimeError("MSF_DB_INGEST with PostgreSQL requires the asyncpg package") from e
+        self.pool = await asyncpg.create_pool(self.url, min_size=1, max_size=self.pool_size)
+
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
+
+    async def fetch(self, query: str, *args: Any) -> List[Dict[str, Any]]:
+        async with self.pool.acquire() as conn:
+            return [dict(row) for row in await conn.fetch(query, *args)]
+
+
+class SqliteMsfDatabase(MsfDatabase):
+    """Same schema in SQLite, for development and local stand-ins"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+        self.lock = asyncio.Lock()
+
+    async def connect(self):
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.create_function("host", 1, lambda address: address)
+
+    async def close(self):
+        if self.conn:
+            self.conn.close()
+
+    def _fetch(self, query: str, args: tuple) -> List[Dict[str, Any]]:
+        # sqlite3 spells numbered parameters ?1, ?2 instead of $1, $2
+        return [dict(row) for row in self.conn.execute(query.replace("$", "?"), args)]
+
+    async def fetch(self, query: str, *args: Any) -> List[Dict[str, Any]]:
+        async with self.lock:
+            return await asyncio.to_thread(self._fetch, query, args)
+
+
+class MsfIngestor:
+    """Pulls rows added to each tool run's msf workspace since the previous pull
+
+    Every tool run of a job records into its own workspace, so tools running
+    concurrently in one stage never see each other's rows.
+    """
+
+    def __init__(self, database: MsfDatabase):
+        self.database = database
+        # Keyed by workspace name
+        self.workspace_ids: Dict[str, int] = {}
+        self.watermarks: Dict[str, Dict[str, int]] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def workspace_name(job_id: str, run: int) -> str:
+        """Workspace of a job's tool run (its index in the job's plan)"""
+        return f"recon-{job_id}-{run}"
+
+    async def ingest(self, job_id: str, run: int) -> Dict[str, List[Dict[str, Any]]]:
+        """New hosts/services/notes/vulns for the tool run since the last call"""
+        workspace = self.workspace_name(job_id, run)
+        # A run's shards share its workspace; serialize pulls so rows are attributed once
+        async with self.locks.setdefault(workspace, asyncio.Lock()):
+            workspace_id = self.workspace_ids.get(workspace)
+            if workspace_id is None:
+                rows = await self.database.fetch(WORKSPACE_QUERY, workspace)
+                if not rows:
+                    return {table: [] for table in QUERIES}
+                workspace_id = self.workspace_ids[workspace] = rows[0]["id"]
+
+            watermarks = self.watermarks.setdefault(workspace, {table: 0 for table in QUERIES})
+            tables = list(QUERIES)
+            results = await asyncio.gather(*(
+                self.database.fetch(QUERIES[table], workspace_id, watermarks[table])
+                for table in tables
+            ))
+
+            rows_by_table = {}
+            for table, rows in zip(tables, results):
+                if rows:
+                    watermarks[table] = rows[-1]["id"]
+                rows_by_table[table] = rows
+            return rows_by_table
+
+    def forget(self, job_id: str):
+        """Drop the state of a job's tool runs once the job is finished"""
+        prefix = self.workspace_name(job_id, 0)[:-1]
+        for state in (self.workspace_ids, self.watermarks, self.locks):
+            for workspace in [name for name in state if name.startswith(prefix)]:
+                del state[workspace]
@@ -0,0 +1,244 @@
+"""
+Metasploit RPC worker pool
+Keeps long-lived msfrpcd (msgrpc) daemons warm and leases consoles from them,
+so module runs do not pay a full framework boot each time
+"""
+
+import asyncio
+import http.client
+import secrets
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import msgpack
+
+from processes import lower_priority
+
+
+class MsfRpcError(Exception):
+    """Raised when an RPC call fails or the daemon returns an error"""
+
+
+class MsfRpcClient:
+    """Minimal synchronous msgrpc client (MessagePack over HTTP)"""
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 uri: str = "/api/", timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.uri = uri
+        self.timeout = timeout
+        self.token: Optional[str] = None
+
+    def _request(self, method: str, *args: Any) -> Any:
+        body = msgpack.packb([method, *args], use_bin_type=True)
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request("POST", self.uri, body, {"Content-Type": "binary/message-pack"})
+            response = conn.getresponse()
+            payload = response.read()
+        except OSError as e:
+            raise MsfRpcError(f"RPC connection to {self.host}:{self.port} failed: {e}") from e
+        finally:
+            conn.close()
+
+        try:
+            data = msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        except Exception as e:
+            raise MsfRpcError(f"Invalid RPC response (HTTP {response.status})") from e
+
+        if isinstance(data, dict) and data.get("error"):
+            raise MsfRpcError(data.get("error_message") or data.get("error_string") or "RPC error")
+        return data
+
+    def login(self):
+        """Authenticate and store the session token"""
+        data = self._request("auth.login", self.username, self.password)
+        if data.get("result") != "success":
+            raise MsfRpcError("RPC authentication failed")
+        self.token = data["token"]
+
+    def call(self, method: str, *args: Any) -> Any:
+        """Call an authenticated RPC method"""
+        if self.token is None:
+            self.login()
+        return self._request(method, self.token, *args)
+
+
+class MsfConsole:
+    """A console leased from a worker"""
+
+    def __init__(self, worker: "MsfRpcWorker", console_id: str):
+        self.worker = worker
+        self.id = console_id
+
+    async def run(self, commands: List[str], timeout: float,
+                  poll_interval: float = 0.5,
+                  on_line: Optional[Callable[[str], None]] = None) -> str:
+        """Run commands in the console and collect output until it goes idle"""
+        client = self.worker.client
+        deadline = time.monotonic() + timeout
+        chunks = []
+        partial = ""
+
+        await asyncio.to_thread(client.call, "console.write", self.id, "\n".join(commands) + "\n")
+
+        # The console reports busy while a module runs; wait for it to drain
+        while True:
+            data = await asyncio.to_thread(client.call, "console.read", self.id)
+            if data.get("data"):
+                chunks.append(data["data"])
+                if on_line:
+                    # Publish complete lines as they arrive
+                    *lines, partial = (partial + data["data"]).split("\n")
+                    for line in lines:
+                        on_line(line)
+            elif chunks and not data.get("busy"):
+                break
+            if time.monotonic() > deadline:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(poll_interval)
+
+        if on_line and partial:
+            on_line(partial)
+        return "".join(chunks)
+
+
+class MsfRpcWorker:
+    """One msfrpcd daemon, optionally spawned and owned by the backend"""
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 msfrpcd_path: Optional[str] = None, startup_timeout: float = 180.0,
+                 niceness: int = 0, env: Optional[Dict[str, str]] = None):
+        self.host = host
+        self.niceness = niceness
+        self.env = env
+        self.port = port
+        self.msfrpcd_path = msfrpcd_path
+        self.startup_timeout = startup_timeout
+        self.client = MsfRpcClient(host, port, username, password)
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.uses = 0
+
+    async def start(self):
+        """Spawn msfrpcd (if managed) and wait until it accepts logins"""
+        if self.msfrpcd_path:
+            self.process = await asyncio.create_subprocess_exec(
+                self.msfrpcd_path,
+                "-U", self.client.username,
+                "-P", self.client.password,
+                "-a", self.host,
+                "-p", str(self.port),
+                "-S",  # plain HTTP on the loopback interface
+                "-f",  # stay in the foreground so we own the process
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=self.env
+            )
+            lower_priority(self.process.pid, self.niceness)
+
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                await asyncio.to_thread(self.client.login)
+                break
+            except MsfRpcError:
+                if self.process and self.process.returncode is not None:
+                    raise MsfRpcError(f"msfrpcd on port {self.port} exited during startup")
+                if time.monotonic() > deadline:
+                    raise MsfRpcError(f"msfrpcd on port {self.port} did not start in time")
+                await asyncio.sleep(1)
+        self.uses = 0
+
+    async def stop(self):
+        """Log out and terminate a managed daemon"""
+        self.client.token = None
+        if self.process and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        self.process = None
+
+    async def restart(self):
+        await self.stop()
+        await self.start()
+
+    async def healthy(self) -> bool:
+        """Check that the daemon is alive and answering RPC calls"""
+        if self.process and self.process.returncode is not None:
+            return False
+        try:
+            await asyncio.to_thread(self.client.call, "core.version")
+            return True
+        except MsfRpcError:
+            return False
+
+    async def open_console(self) -> MsfConsole:
+        data = await asyncio.to_thread(self.client.call, "console.create")
+        console = MsfConsole(self, str(data["id"]))
+        # Discard the banner so it does not end up in module output
+        await asyncio.to_thread(self.client.call, "console.read", console.id)
+        return console
+
+    async def close_console(self, console: MsfConsole):
+        try:
+            await asyncio.to_thread(self.client.call, "console.destroy", console.id)
+        except MsfRpcError:
+            pass
+
+
+class MsfRpcPool:
+    """Pool of warm msfrpcd workers that hands out one console per lease"""
+
+    def __init__(self, size: int, host: str, base_port: int, username: str,
+                 password: str = "", msfrpcd_path: Optional[str] = None,
+                 max_uses: int = 50, niceness: int = 0,
+                 env: Optional[Dict[str, str]] = None):
+        # Security: never run spawned daemons with an empty or default password
+        if msfrpcd_path and not password:
+            password = secrets.token_urlsafe(24)
+
+        self.max_uses = max_uses
+        self.workers = [
+            MsfRpcWorker(host, base_port + i, username, password, msfrpcd_path,
+                         niceness=niceness, env=env)
+            for i in range(size)
+        ]
+        self.idle: asyncio.Queue = asyncio.Queue()
+
+    async def start(self):
+        """Boot all workers in parallel and mark them idle"""
+        await asyncio.gather(*(worker.start() for worker in self.workers))
+        for worker in self.workers:
+            self.idle.put_nowait(worker)
+
+    async def stop(self):
+        await asyncio.gather(*(worker.stop() for worker in self.workers),
+                             return_exceptions=True)
+
+    @asynccontextmanager
+    async def console(self) -> AsyncIterator[MsfConsole]:
+        """Lease a console, returning the worker to the pool afterwards"""
+        worker = await self.idle.get()
+        try:
+            if not await worker.healthy():
+                await worker.restart()
+
+            console = await worker.open_console()
+            try:
+                yield console
+            finally:
+                await worker.close_console(console)
+                worker.uses += 1
+
+            # Recycle long-lived daemons to shed leaked memory and module state
+            if worker.uses >= self.max_uses:
+                await worker.restart()
+        finally:
+            self.idle.put_nowait(worker)
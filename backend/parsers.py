@@ -0,0 +1,180 @@
+"""
+Structured output parsers for Metasploit Recon Backend
+Turns msfconsole output into compact typed records (hosts, ports, services,
+shares, DNS records, URLs) stored next to the raw text. parse_output is a
+plain module-level function so it can run in a process pool.
+"""
+
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+# Console prefixes: [+] good, [*] status, [-] error, [!] warning
+PREFIX = r"^\s*\[[+*!-]\]\s*"
+GOOD = r"^\s*\[\+\]\s*"
+ADDR = r"(?P<host>[0-9A-Za-z.:\-\[\]]+?)"
+
+
+@dataclass
+class HostRecord:
+    host: str
+    state: str = "up"
+    info: Optional[Dict[str, str]] = None
+    type: str = "host"
+
+
+@dataclass
+class PortRecord:
+    host: str
+    port: int
+    proto: str
+    state: str = "open"
+    service: Optional[str] = None
+    banner: Optional[str] = None
+    type: str = "port"
+
+
+@dataclass
+class ShareRecord:
+    host: str
+    share: str
+    share_type: Optional[str] = None
+    comment: Optional[str] = None
+    type: str = "share"
+
+
+@dataclass
+class DnsRecord:
+    name: str
+    record_type: str
+    value: str
+    type: str = "dns"
+
+
+@dataclass
+class UrlRecord:
+    url: str
+    host: Optional[str] = None
+    status: Optional[int] = None
+    type: str = "url"
+
+
+TCP_OPEN = re.compile(PREFIX + r".*?" + ADDR + r":(?P<port>\d+)\s+-\s+TCP OPEN")
+SYN_OPEN = re.compile(PREFIX + r"TCP OPEN\s+" + ADDR + r":(?P<port>\d+)")
+UDP_DISCOVERED = re.compile(PREFIX + r"Discovered (?P<service>\S+) on " + ADDR + r":(?P<port>\d+)(?: \((?P<banner>.*)\))?")
+SMB_SHARE = re.compile(PREFIX + ADDR + r":\d+\s+-\s+(?P<share>\S+)\s+-\s+\((?P<kind>[^)]*)\)\s*(?P<comment>.*)$")
+SNMP_CONNECTED = re.compile(PREFIX + ADDR + r"(?::\d+)?,?\s+Connected\.")
+SNMP_FIELD = re.compile(r"^\s*(?P<key>[A-Za-z][\w ./-]*?)\s*:\s*(?P<value>\S.*)$")
+DNS_ANSWER = re.compile(PREFIX + r"(?:.*?:\s*)?(?P<name>[\w.\-*]+)\s+(?:\d+\s+)?(?:IN\s+)?"
+                        r"(?P<rtype>A|AAAA|CNAME|MX|NS|SOA|TXT|SRV|PTR):?\s+(?P<value>.+)$")
+CRAWL_URL = re.compile(r"(?P<status>\d{3})\s+-\s+" + ADDR + r"\s+-\s+(?P<url>https?://\S+)")
+# Only [+] lines carry a fingerprint; "host:port - message" lines are errors and status
+HTTP_VERSION = re.compile(GOOD + ADDR + r":(?P<port>\d+)\s+(?!-\s)(?P<banner>\S.*)$")
+
+
+def _parse_tcp_portscan(output: str) -> List[Any]:
+    return [
+        PortRecord(host=m.group("host"), port=int(m.group("port")), proto="tcp")
+        for m in map(TCP_OPEN.match, output.splitlines()) if m
+    ]
+
+
+def _parse_syn_portscan(output: str) -> List[Any]:
+    return [
+        PortRecord(host=m.group("host"), port=int(m.group("port")), proto="tcp")
+        for m in map(SYN_OPEN.match, output.splitlines()) if m
+    ]
+
+
+def _parse_udp_sweep(output: str) -> List[Any]:
+    records: List[Any] = []
+    hosts = set()
+    for m in map(UDP_DISCOVERED.match, output.splitlines()):
+        if not m:
+            continue
+        host = m.group("host")
+        if host not in hosts:
+            hosts.add(host)
+            records.append(HostRecord(host=host))
+        records.append(PortRecord(
+            host=host, port=int(m.group("port")), proto="udp",
+            service=m.group("service").lower(), banner=m.group("banner")
+        ))
+    return records
+
+
+def _parse_smb_enumshares(output: str) -> List[Any]:
+    return [
+        ShareRecord(
+            host=m.group("host"), share=m.group("share"),
+            share_type=m.group("kind") or None, comment=m.group("comment").strip() or None
+        )
+        for m in map(SMB_SHARE.match, output.splitlines()) if m
+    ]
+
+
+def _parse_snmp_enum(output: str) -> List[Any]:
+    records: List[Any] = []
+    current: Optional[HostRecord] = None
+    for line in output.splitlines():
+        connected = SNMP_CONNECTED.match(line)
+        if connected:
+            current = HostRecord(host=connected.group("host"), info={})
+            records.append(current)
+            continue
+        # "Hostname : srv01" style key/value lines belong to the last host
+        field = SNMP_FIELD.match(line)
+        if current is not None and field and not line.lstrip().startswith("["):
+            current.info[field.group("key").strip()] = field.group("value").strip()
+    return records
+
+
+def _parse_dns_enum(output: str) -> List[Any]:
+    return [
+        DnsRecord(name=m.group("name"), record_type=m.group("rtype"), value=m.group("value").strip())
+        for m in map(DNS_ANSWER.match, output.splitlines()) if m
+    ]
+
+
+def _parse_crawl(output: str) -> List[Any]:
+    records = []
+    seen = set()
+    for m in map(CRAWL_URL.search, output.splitlines()):
+        if m and m.group("url") not in seen:
+            seen.add(m.group("url"))
+            records.append(UrlRecord(url=m.group("url"), host=m.group("host"), status=int(m.group("status"))))
+    return records
+
+
+def _parse_http_version(output: str) -> List[Any]:
+    return [
+        PortRecord(
+            host=m.group("host"), port=int(m.group("port")), proto="tcp",
+            service="http", banner=m.group("banner").strip()
+        )
+        for m in map(HTTP_VERSION.match, output.splitlines()) if m
+    ]
+
+
+# One parser per module in tools.MODULE_MAPPING
+PARSERS: Dict[str, Callable[[str], List[Any]]] = {
+    "auxiliary/scanner/discovery/udp_sweep": _parse_udp_sweep,
+    "auxiliary/scanner/portscan/syn": _parse_syn_portscan,
+    "auxiliary/scanner/portscan/tcp": _parse_tcp_portscan,
+    "auxiliary/scanner/smb/smb_enumshares": _parse_smb_enumshares,
+    "auxiliary/scanner/snmp/snmp_enum": _parse_snmp_enum,
+    "auxiliary/gather/dns_enum": _parse_dns_enum,
+    "auxiliary/scanner/http/crawl": _parse_crawl,
+    "auxiliary/scanner/http/http_version": _parse_http_version
+}
+
+
+def parse_output(module: str, output: str) -> List[Dict[str, Any]]:
+    """Parse a module's console output into record dicts; unknown modules yield no records"""
+    parser = PARSERS.get(module)
+    if parser is None or not output:
+        return []
+    return [
+        {key: value for key, value in asdict(record).items() if value is not None}
+        for record in parser(output)
+    ]
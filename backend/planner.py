@@ -0,0 +1,103 @@
+"""
+Job planner for Metasploit Recon Backend
+Builds a per-job dependency graph of tools and runs independent branches concurrently
+"""
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from tools import MODULE_MAPPING, TOOL_CATEGORIES, build_module_commands
+
+# Execution stages by tool category. A tool depends on every tool of the job
+# in an earlier stage; tools within the same stage are independent.
+CATEGORY_STAGES = {
+    "discovery": 0,
+    "port_scan": 1,
+    "service_scan": 2,
+    "fingerprint": 2,
+    "network_service": 2,
+    "web": 2,
+    "vulnerability": 3
+}
+DEFAULT_STAGE = 2
+
+
+@dataclass
+class PlannedTool:
+    index: int
+    name: str
+    config: Dict[str, Any]
+    stage: int
+    depends_on: List[int] = field(default_factory=list)
+    # Index of an identical module run this tool reuses instead of running again
+    shares_run_of: Optional[int] = None
+    # Name of the run's workspace files (<file_stem>.rc, <file_stem>_output.txt)
+    file_stem: str = ""
+
+
+def run_key(name: str, target: str, config: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+    """Identity of a module run: the module plus every command it would receive"""
+    module = MODULE_MAPPING.get(name)
+    if not module:
+        return None
+    return (module, *build_module_commands(module, target, config))
+
+
+def plan_job(tools: List[Dict[str, Any]], target: str) -> List[PlannedTool]:
+    """Build the dependency graph for a job's tools"""
+    plan = []
+    for index, tool in enumerate(tools):
+        category = TOOL_CATEGORIES.get(tool['name'])
+        plan.append(PlannedTool(
+            index=index,
+            name=tool['name'],
+            config=tool.get('config') or {},
+            stage=CATEGORY_STAGES.get(category, DEFAULT_STAGE)
+        ))
+
+    # A tool requested more than once (with other options) may run concurrently
+    # with itself: each run gets its own files
+    name_counts = Counter(node.name for node in plan)
+    for node in plan:
+        node.depends_on = [other.index for other in plan if other.stage < node.stage]
+        node.file_stem = node.name if name_counts[node.name] == 1 else f"{node.name}.{node.index}"
+
+    # Run identical (module, RHOSTS, options) tuples once; the earliest-stage
+    # tool runs the module and the others wait for it and reuse its output
+    primaries: Dict[Tuple[str, ...], PlannedTool] = {}
+    for node in sorted(plan, key=lambda n: (n.stage, n.index)):
+        key = run_key(node.name, target, node.config)
+        if key is None:
+            continue
+        primary = primaries.setdefault(key, node)
+        if primary is not node:
+            node.shares_run_of = primary.index
+            if primary.index not in node.depends_on:
+                node.depends_on.append(primary.index)
+    return plan
+
+
+async def run_plan(plan: List[PlannedTool],
+                   runner: Callable[[PlannedTool], Awaitable[None]],
+                   parallelism: int):
+    """Run each planned tool once its dependencies finish, at most `parallelism` at a time"""
+    finished = {node.index: asyncio.Event() for node in plan}
+    slots = asyncio.Semaphore(max(1, parallelism))
+
+    async def run_node(node: PlannedTool):
+        for dependency in node.depends_on:
+            await finished[dependency].wait()
+        async with slots:
+            await runner(node)
+        finished[node.index].set()
+
+    tasks = [asyncio.create_task(run_node(node)) for node in plan]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # A failing tool fails the job; do not leave siblings running
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
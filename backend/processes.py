@@ -0,0 +1,84 @@
+"""
+Child process control for Metasploit Recon Backend
+msfconsole spawns ruby helpers, so scans run in their own process group and
+are stopped as a group on timeout or cancellation
+"""
+
+import asyncio
+import os
+import signal
+from typing import Callable, Optional
+
+PIPE_CHUNK_SIZE = 64 * 1024
+
+
+def _signal_group(pid: int, sig: int) -> bool:
+    """Send a signal to the process group led by pid; False if it no longer exists"""
+    try:
+        os.killpg(pid, sig)
+        return True
+    except ProcessLookupError:
+        return False
+
+
+async def terminate_process_group(process: asyncio.subprocess.Process, grace: float = 5.0):
+    """SIGTERM the process group, then SIGKILL whatever is left after the grace period"""
+    if not hasattr(os, 'killpg'):
+        # No process groups (Windows): fall back to the direct child
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+        return
+
+    _signal_group(process.pid, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=grace)
+    except asyncio.TimeoutError:
+        pass
+    _signal_group(process.pid, signal.SIGKILL)
+    await process.wait()
+
+
+def sweep_process_group(process: asyncio.subprocess.Process):
+    """Kill orphans left in a finished process's group (e.g. ruby children after a timeout)"""
+    if hasattr(os, 'killpg'):
+        _signal_group(process.pid, signal.SIGKILL)
+
+
+def lower_priority(pid: int, niceness: int):
+    """Renice a freshly spawned child so scans yield the CPU to the API"""
+    if niceness <= 0 or not hasattr(os, 'setpriority'):
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, pid, niceness)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def pump_lines(stream: asyncio.StreamReader, on_line: Optional[Callable[[str], None]],
+                     chunk_size: int = PIPE_CHUNK_SIZE):
+    """Drain a pipe to EOF, passing each line to on_line; lines over chunk_size arrive in pieces"""
+    # Chunked reads: readline() gives up on lines over the stream limit and the pipe fills
+    pending = b""
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            break
+        if on_line is None:
+            continue
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        while len(pending) >= chunk_size:
+            lines.append(pending[:chunk_size])
+            pending = pending[chunk_size:]
+        for raw in lines:
+            _emit(on_line, raw)
+    if pending and on_line is not None:
+        _emit(on_line, pending)
+
+
+def _emit(on_line: Callable[[str], None], raw: bytes):
+    try:
+        on_line(raw.decode(errors='replace').rstrip('\r'))
+    except Exception:
+        pass  # a failing consumer must not stop the pipe being drained
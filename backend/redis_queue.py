@@ -0,0 +1,178 @@
+"""
+Redis-backed tool task queue for Metasploit Recon Backend
+The API process submits tool runs; worker nodes claim them under a lease,
+heartbeat while running, stream output lines back and publish the result.
+Tasks whose lease expires (dead worker) are requeued.
+"""
+
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+KEY_PREFIX = "recon"
+TASKS_KEY = f"{KEY_PREFIX}:tasks"
+PROCESSING_KEY = f"{KEY_PREFIX}:processing"
+LEASES_KEY = f"{KEY_PREFIX}:leases"
+EVENTS_TTL = 3600  # seconds an unconsumed event list survives
+
+
+def _task_key(task_id: str) -> str:
+    return f"{KEY_PREFIX}:task:{task_id}"
+
+
+def _events_key(task_id: str) -> str:
+    return f"{KEY_PREFIX}:task:{task_id}:events"
+
+
+def _cancel_key(task_id: str) -> str:
+    return f"{KEY_PREFIX}:task:{task_id}:cancel"
+
+
+class RedisTaskQueue:
+    """Lease-based task queue; any process holding one can submit, claim or reap"""
+
+    def __init__(self, redis, lease_seconds: int = 30, max_attempts: int = 3):
+        self.redis = redis
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._unleased_seen: Set[str] = set()
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisTaskQueue":
+        import redis.asyncio as aioredis
+        return cls(aioredis.from_url(url, decode_responses=True), **kwargs)
+
+    async def close(self):
+        await self.redis.close()
+
+    # Control plane side
+
+    async def submit(self, payload: Dict[str, Any], ttl: int) -> str:
+        """Queue a task whose hash outlives the submitter's wait (ttl seconds) by EVENTS_TTL at most"""
+        task_id = str(uuid.uuid4())
+        await self.redis.hset(_task_key(task_id), mapping={
+            "payload": json.dumps(payload),
+            "attempts": 0
+        })
+        await self.redis.expire(_task_key(task_id), int(ttl) + EVENTS_TTL)
+        await self.redis.lpush(TASKS_KEY, task_id)
+        return task_id
+
+    async def next_events(self, task_id: str, timeout: float) -> List[Dict[str, Any]]:
+        """Wait up to timeout for events, then drain whatever else is queued"""
+        first = await self.redis.blpop([_events_key(task_id)], timeout=max(1, int(timeout)))
+        if first is None:
+            return []
+        raw = [first[1]]
+        while True:
+            item = await self.redis.lpop(_events_key(task_id))
+            if item is None:
+                break
+            raw.append(item)
+        return [json.loads(item) for item in raw]
+
+    async def request_cancel(self, task_id: str):
+        await self.redis.set(_cancel_key(task_id), 1, ex=EVENTS_TTL)
+        # Still queued: take it off the queue so no worker starts it
+        if await self.redis.lrem(TASKS_KEY, 0, task_id):
+            await self.cleanup(task_id)
+        else:
+            # Claimed: the worker still reads it until it notices, then nobody does
+            await self.redis.expire(_task_key(task_id), EVENTS_TTL)
+
+    async def cleanup(self, task_id: str):
+        await self.redis.delete(_task_key(task_id), _events_key(task_id), _cancel_key(task_id))
+
+    # Worker side
+
+    async def claim(self, timeout: float, worker: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Take the oldest task and lease it; None when nothing arrived in time"""
+        task_id = await self.redis.blmove(TASKS_KEY, PROCESSING_KEY, max(1, int(timeout)), "RIGHT", "LEFT")
+        if task_id is None:
+            return None
+        await self.redis.zadd(LEASES_KEY, {task_id: time.time() + self.lease_seconds})
+        attempt = await self.redis.hincrby(_task_key(task_id), "attempts", 1)
+
+        raw = await self.redis.hget(_task_key(task_id), "payload")
+        if raw is None:
+            # Cancelled and cleaned up (or expired) while queued; HINCRBY recreated the hash
+            await self.redis.delete(_task_key(task_id))
+            await self._release(task_id)
+            return None
+        # The submitter times the run from here, not from when it was queued
+        key = _events_key(task_id)
+        await self.redis.rpush(key, json.dumps({"kind": "started", "worker": worker, "attempt": attempt}))
+        await self.redis.expire(key, EVENTS_TTL)
+        payload = json.loads(raw)
+        payload["task_id"] = task_id
+        return payload
+
+    async def heartbeat(self, task_id: str) -> str:
+        """Extend the lease; returns 'ok', 'cancelled' or 'lost' (lease was reaped)"""
+        if await self.redis.zscore(LEASES_KEY, task_id) is None:
+            return "lost"
+        await self.redis.zadd(LEASES_KEY, {task_id: time.time() + self.lease_seconds}, xx=True)
+        if await self.redis.exists(_cancel_key(task_id)):
+            return "cancelled"
+        return "ok"
+
+    async def publish_lines(self, task_id: str, lines: List[str]):
+        if not lines:
+            return
+        key = _events_key(task_id)
+        await self.redis.rpush(key, *(json.dumps({"kind": "line", "line": line}) for line in lines))
+        await self.redis.expire(key, EVENTS_TTL)
+
+    async def complete(self, task_id: str, result: Dict[str, Any]):
+        key = _events_key(task_id)
+        await self.redis.rpush(key, json.dumps({"kind": "result", "result": result}))
+        await self.redis.expire(key, EVENTS_TTL)
+        # Deleted by the submitter when it collects the result; expires if it gave up
+        await self.redis.expire(_task_key(task_id), EVENTS_TTL)
+        await self._release(task_id)
+
+    async def _release(self, task_id: str):
+        await self.redis.zrem(LEASES_KEY, task_id)
+        await self.redis.lrem(PROCESSING_KEY, 0, task_id)
+
+    # Recovery
+
+    async def requeue_expired(self) -> int:
+        """Requeue tasks whose worker stopped heartbeating; safe to run from many processes"""
+        requeued = 0
+        expired = await self.redis.zrangebyscore(LEASES_KEY, 0, time.time())
+
+        # A worker that died between claiming and leasing leaves an unleased
+        # entry; requeue it if it is still unleased on the next sweep
+        processing = await self.redis.lrange(PROCESSING_KEY, 0, -1)
+        unleased = set()
+        for task_id in processing:
+            if await self.redis.zscore(LEASES_KEY, task_id) is None:
+                unleased.add(task_id)
+        stale = unleased & self._unleased_seen
+        self._unleased_seen = unleased - stale
+
+        for task_id in expired:
+            # ZREM succeeds for exactly one reaper
+            if await self.redis.zrem(LEASES_KEY, task_id):
+                requeued += await self._requeue(task_id)
+        for task_id in stale:
+            if await self.redis.lrem(PROCESSING_KEY, 0, task_id):
+                requeued += await self._requeue(task_id, in_processing=False)
+        return requeued
+
+    async def _requeue(self, task_id: str, in_processing: bool = True) -> int:
+        if in_processing:
+            await self.redis.lrem(PROCESSING_KEY, 0, task_id)
+        attempts = int(await self.redis.hget(_task_key(task_id), "attempts") or 0)
+        if attempts >= self.max_attempts or await self.redis.exists(_cancel_key(task_id)):
+            await self.complete(task_id, {
+                "success": False,
+                "error": f"Worker lost after {attempts} attempts",
+                "output": ""
+            })
+            return 0
+        # Requeued tasks go to the front of the queue
+        await self.redis.rpush(TASKS_KEY, task_id)
+        return 1
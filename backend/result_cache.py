@@ -0,0 +1,98 @@
+"""
+Scan result cache for Metasploit Recon Backend
+Content-keyed by (module, normalized target, effective options) with a
+freshness TTL per tool category and LRU eviction
+"""
+
+import hashlib
+import ipaddress
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
+
+from planner import run_key
+from tools import TOOL_CATEGORIES
+
+
+def normalize_target(target: str) -> str:
+    """Canonical form of a target so equivalent spellings share cache entries"""
+    try:
+        return str(ipaddress.ip_network(target.strip(), strict=False))
+    except ValueError:
+        return target.strip().lower()
+
+
+def cache_key(tool_name: str, target: str, config: Dict[str, Any]) -> Optional[str]:
+    key = run_key(tool_name, normalize_target(target), config)
+    if key is None:
+        return None
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+
+def result_bytes(result: Dict[str, Any]) -> int:
+    """Approximate memory held by a result: its text, plus everything else as JSON"""
+    text = sum(len(value) for value in result.values() if isinstance(value, str))
+    rest = {key: value for key, value in result.items() if not isinstance(value, str)}
+    return text + len(json.dumps(rest, default=str))
+
+
+class CachedResult(NamedTuple):
+    stored_at: float  # monotonic
+    stored_iso: str
+    result: Dict[str, Any]
+    size: int  # result_bytes
+
+
+class ResultCache:
+    """LRU of successful tool results, bounded by entry count and bytes"""
+
+    def __init__(self, ttls: Dict[str, int], max_entries: int = 500, default_ttl: int = 300,
+                 max_bytes: Optional[int] = None):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self.total_bytes = 0
+
+    def ttl_for(self, tool_name: str) -> int:
+        return self.ttls.get(TOOL_CATEGORIES.get(tool_name), self.default_ttl)
+
+    def get(self, tool_name: str, target: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return a copy of a fresh cached result, marked as cached"""
+        key = cache_key(tool_name, target, config)
+        entry = self.entries.get(key) if key else None
+        if entry is None:
+            return None
+
+        stored_at, stored_iso, result, size = entry
+        if time.monotonic() - stored_at > self.ttl_for(tool_name):
+            del self.entries[key]
+            self.total_bytes -= size
+            return None
+
+        self.entries.move_to_end(key)
+        cached = dict(result)
+        cached["cached"] = True
+        cached["cached_at"] = stored_iso
+        return cached
+
+    def put(self, tool_name: str, target: str, config: Dict[str, Any], result: Dict[str, Any]):
+        """Store a successful result, evicting the least recently used entries"""
+        key = cache_key(tool_name, target, config)
+        if key is None or not result.get("success") or result.get("cached"):
+            return
+
+        size = result_bytes(result)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.total_bytes -= previous.size
+        self.entries[key] = CachedResult(time.monotonic(), datetime.utcnow().isoformat(), result, size)
+        self.total_bytes += size
+        while len(self.entries) > self.max_entries or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes):
+            self.total_bytes -= self.entries.popitem(last=False)[1].size
@@ -0,0 +1,173 @@
+"""
+Result retention for Metasploit Recon Backend
+Only result summaries stay resident: the bulky parts of every tool result
+(console output, parsed records, framework database rows) are spilled to
+workspace/<job_id>/results/ when recorded and read back on demand through a
+byte-bounded LRU cache, which holds them compressed like the files. Console
+output already stored in the workspace is referenced rather than copied.
+"""
+
+import asyncio
+import glob
+import json
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from compression import compress_chunk, decompress_chunk, read_stored, stored_size, write_compressed
+
+SPILL_DIR = "results"
+SPILLED_FIELDS = ("output", "stderr", "records", "msf_db")
+
+
+class ResultRetention:
+    """Spills tool results to the workspace and hydrates them through a byte-bounded LRU"""
+
+    def __init__(self, workspace_dir: Path, cache_bytes: int,
+                 codec: Optional[str] = None, level: int = 3):
+        self.workspace_dir = workspace_dir
+        self.cache_bytes = cache_bytes
+        self.codec = codec
+        self.level = level
+        # (job_id, file) -> JSON of the spilled fields, referenced output included,
+        # compressed with codec
+        self.cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Expired jobs are dropped from the job store's writer thread
+        self.lock = threading.Lock()
+
+    async def spill(self, job_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Write a result entry's bulky fields to disk; returns the summary entry to keep"""
+        result = entry["result"]
+        bulky = {key: result[key] for key in SPILLED_FIELDS if key in result}
+        if not bulky:
+            return entry
+        # Serializing and compressing large outputs must not stall the event loop
+        spilled = await asyncio.to_thread(self._spill, job_id, result.get("output_name") or entry["tool"], bulky)
+        summary = {key: value for key, value in result.items() if key not in SPILLED_FIELDS}
+        summary["spilled"] = spilled
+        return {**entry, "result": summary}
+
+    def _spill(self, job_id: str, stem: str, bulky: Dict[str, Any]) -> Dict[str, Any]:
+        job_dir = self.workspace_dir / job_id
+        # Unique per spill: resumed jobs record their tools again
+        file_name = f"{SPILL_DIR}/{stem}-{uuid.uuid4().hex[:12]}.json"
+        path = job_dir / file_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        full = json.dumps(bulky, default=str)
+        spilled: Dict[str, Any] = {"file": file_name}
+        output = bulky.get("output")
+        output_file = f"{stem}_output.txt"
+        try:
+            # The console output is already stored in the workspace: reference it, as checkpoints do
+            if output and stored_size(job_dir / output_file) == len(output.encode()):
+                spilled["output_file"] = output_file
+        except OSError:
+            pass
+        data = full
+        if "output_file" in spilled:
+            data = json.dumps({key: value for key, value in bulky.items() if key != "output"}, default=str)
+        if self.codec:
+            write_compressed(path, data.encode(), self.codec, self.level)
+        else:
+            path.write_text(data)
+
+        # Counted against the storage budget as stored, i.e. compressed, with the
+        # tool's console outputs (shards included) that stay in the workspace
+        name = glob.escape(stem)
+        spilled["bytes"] = self._disk_bytes(job_dir, [
+            glob.escape(file_name) + "*", f"{name}_output.txt*", f"{name}.shard*_output.txt*"
+        ])
+        # Results of running jobs are usually polled right after they are recorded
+        self._remember((job_id, file_name), full.encode())
+        return spilled
+
+    @staticmethod
+    def _disk_bytes(job_dir: Path, patterns: List[str]) -> int:
+        """Bytes on disk of the files matching patterns, frame indexes included"""
+        total = 0
+        for path in [path for pattern in patterns for path in job_dir.glob(pattern)]:
+            try:
+                total += path.stat().st_size
+            except OSError:
+                continue  # replaced while we looked
+        return total
+
+    async def hydrate(self, job_id: str, entries: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Full result entries, with spilled fields read back through the cache"""
+        hydrated = []
+        for entry in entries:
+            spilled = entry["result"].get("spilled")
+            if not spilled:
+                hydrated.append(entry)
+                continue
+            bulky = await asyncio.to_thread(self._load, job_id, spilled)
+            result = {key: value for key, value in entry["result"].items() if key != "spilled"}
+            hydrated.append({**entry, "result": {**result, **bulky}})
+        return hydrated
+
+    def _load(self, job_id: str, spilled: Dict[str, Any]) -> Dict[str, Any]:
+        key = (job_id, spilled["file"])
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is not None:
+            return json.loads(decompress_chunk(self.codec, cached) if self.codec else cached)
+
+        job_dir = self.workspace_dir / job_id
+        try:
+            bulky = json.loads(read_stored(job_dir / spilled["file"]))
+            if spilled.get("output_file"):
+                bulky["output"] = read_stored(job_dir / spilled["output_file"]).decode(errors='replace')
+        except (OSError, ValueError):
+            return {"output": "", "spill_error": f"Spilled result {spilled['file']} is missing or unreadable"}
+        self._remember(key, json.dumps(bulky).encode())
+        return bulky
+
+    def _remember(self, key: Tuple[str, str], data: bytes):
+        blob = compress_chunk(self.codec, data, self.level) if self.codec else data
+        if len(blob) > self.cache_bytes:
+            return
+        with self.lock:
+            previous = self.cache.pop(key, None)
+            if previous is not None:
+                self.cached_bytes -= len(previous)
+            self.cache[key] = blob
+            self.cached_bytes += len(blob)
+            while self.cached_bytes > self.cache_bytes:
+                _, evicted = self.cache.popitem(last=False)
+                self.cached_bytes -= len(evicted)
+                self.evictions += 1
+
+    def expire(self, job_ids: List[str]):
+        """Delete the workspaces of jobs dropped from the history, and their cached results"""
+        expired = set(job_ids)
+        with self.lock:
+            for key in [key for key in self.cache if key[0] in expired]:
+                self.cached_bytes -= len(self.cache.pop(key))
+        for job_id in expired:
+            shutil.rmtree(self.workspace_dir / job_id, ignore_errors=True)
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache_entries": len(self.cache),
+                "cache_bytes": self.cached_bytes,
+                "cache_limit_bytes": self.cache_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,135 @@
+"""
+Global job scheduler for Metasploit Recon Backend
+Runs at most MAX_CONCURRENT_JOBS jobs at once from a bounded priority queue
+"""
+
+import asyncio
+import bisect
+import itertools
+import math
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class QueueFullError(Exception):
+    """Raised when the pending queue is at capacity"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Job queue is full")
+        self.retry_after = retry_after
+
+
+class JobScheduler:
+    """Bounded priority queue of job IDs drained by a fixed set of workers"""
+
+    def __init__(self, runner: Callable[[str], Awaitable[None]], workers: int,
+                 max_pending: int, initial_job_seconds: float = 600.0):
+        self.runner = runner
+        self.worker_count = max(1, workers)
+        self.max_pending = max_pending
+
+        # Sorted by (-priority, sequence): higher priority first, FIFO within a priority
+        self.pending: List[Tuple[int, int, str]] = []
+        self.running: Dict[str, float] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self._cancelled: Set[str] = set()
+        self._sequence = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+
+        # Moving average of job durations, used for ETAs and Retry-After
+        self.avg_job_seconds = initial_job_seconds
+
+    async def start(self):
+        self._condition = asyncio.Condition()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, job_id: str, priority: int = 0):
+        """Queue a job, raising QueueFullError when the queue is at capacity"""
+        self.check_capacity()
+
+        bisect.insort(self.pending, (-priority, next(self._sequence), job_id))
+        async with self._condition:
+            self._condition.notify()
+
+    def check_capacity(self):
+        """Raise QueueFullError if a job submitted now would be rejected"""
+        if len(self.pending) >= self.max_pending:
+            raise QueueFullError(self.retry_after())
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a pending job or cancel a running one; False if the scheduler does not hold it"""
+        for index, (_, _, pending_id) in enumerate(self.pending):
+            if pending_id == job_id:
+                del self.pending[index]
+                return True
+
+        task = self.tasks.get(job_id)
+        if task is None or task.done():
+            return False
+        self._cancelled.add(job_id)
+        task.cancel()
+        return True
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Zero-based queue position of a pending job"""
+        for index, (_, _, pending_id) in enumerate(self.pending):
+            if pending_id == job_id:
+                return index
+        return None
+
+    def eta_seconds(self, job_id: str) -> Optional[int]:
+        """Estimated seconds until a pending job starts"""
+        position = self.position(job_id)
+        if position is None:
+            return None
+
+        # Time until the soonest running job frees its worker, then whole
+        # job-durations for every batch of workers ahead of us
+        now = time.monotonic()
+        remaining = [
+            max(0.0, self.avg_job_seconds - (now - started))
+            for started in self.running.values()
+        ]
+        first_free = min(remaining) if len(remaining) >= self.worker_count else 0.0
+        return int(first_free + (position // self.worker_count) * self.avg_job_seconds)
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up"""
+        return max(1, math.ceil(self.avg_job_seconds / self.worker_count))
+
+    async def _worker(self):
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self.pending)
+                _, _, job_id = self.pending.pop(0)
+
+            started = time.monotonic()
+            self.running[job_id] = started
+            task = asyncio.create_task(self.runner(job_id))
+            self.tasks[job_id] = task
+            try:
+                await task
+            except asyncio.CancelledError:
+                # A cancelled job frees this worker; only stop() ends the worker
+                if job_id not in self._cancelled:
+                    raise
+            except Exception:
+                # The runner records job failures itself; keep the worker alive
+                pass
+            finally:
+                self.running.pop(job_id, None)
+                self.tasks.pop(job_id, None)
+                if job_id in self._cancelled:
+                    self._cancelled.discard(job_id)
+                else:
+                    duration = time.monotonic() - started
+                    self.avg_job_seconds = 0.8 * self.avg_job_seconds + 0.2 * duration
@@ -0,0 +1,51 @@
+"""
+Target sharding for Metasploit Recon Backend
+Splits large CIDR targets into equal-sized subnets that can be scanned in
+parallel, and merges the per-shard results back into one tool result
+"""
+
+import ipaddress
+from typing import Dict, List
+
+
+def shard_target(target: str, shard_size: int, max_shards: int) -> List[str]:
+    """Split a CIDR target into at most max_shards subnets of about shard_size hosts"""
+    try:
+        network = ipaddress.ip_network(target, strict=False)
+    except ValueError:
+        # Hostnames and ranges msfconsole understands but we do not: one shard
+        return [target]
+
+    if network.num_addresses <= shard_size:
+        return [target]
+
+    # Equal-sized subnets keep shards host-count balanced
+    # shard count wins over shard size when the two limits conflict
+    size_prefix = network.max_prefixlen - (max(1, shard_size).bit_length() - 1)
+    count_prefix = network.prefixlen + (max(1, max_shards).bit_length() - 1)
+    prefix = max(network.prefixlen, min(size_prefix, count_prefix))
+    return [str(subnet) for subnet in network.subnets(new_prefix=prefix)]
+
+
+def merge_shard_results(targets: List[str], results: List[Dict], attempts: List[int]) -> Dict:
+    """Combine per-shard results into a single tool result"""
+    outputs = []
+    shards = []
+    for target, result, tries in zip(targets, results, attempts):
+        outputs.append(f"[*] Shard {target}\n{result.get('output', '')}")
+        shard = {"target": target, "success": bool(result.get("success")), "attempts": tries}
+        if result.get("threads"):
+            shard["threads"] = result["threads"]
+        if result.get("error"):
+            shard["error"] = result["error"]
+        shards.append(shard)
+
+    failed = [shard for shard in shards if not shard["success"]]
+    merged = {
+        "success": not failed,
+        "output": "\n".join(outputs),
+        "shards": shards
+    }
+    if failed:
+        merged["error"] = f"{len(failed)} of {len(shards)} shards failed"
+    return merged
@@ -0,0 +1,55 @@
+"""
+Test setup for Metasploit Recon Backend
+Backend modules are flat and imported by name, as when running from backend/
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FAKE_MSFCONSOLE = r'''#!/bin/bash
+# Stands in for msfconsole: echoes the resource script and fakes a slow scan
+while [ $# -gt 0 ]; do case "$1" in -r) RC=$2; shift;; -o) OUT=$2; shift;; esac; shift; done
+while IFS= read -r line || [ -n "$line" ]; do
+  case "$line" in
+    "<ruby>"|"</ruby>"|print_line*) ;;
+    run) for i in 1 2 3; do sleep ${FAKE_SCAN_STEP:-0.1}; echo "[*] Scanned $i of 3 hosts" | tee -a "$OUT"; done;;
+    *) echo "msf > $line" | tee -a "$OUT";;
+  esac
+done < "$RC"
+'''
+
+
+@pytest.fixture
+def make_backend(tmp_path, monkeypatch):
+    """Build a backend in tmp_path that runs tools with a fake msfconsole"""
+    from config import Config
+
+    monkeypatch.chdir(tmp_path)
+    console = tmp_path / "msfconsole"
+    console.write_text(FAKE_MSFCONSOLE)
+    console.chmod(0o755)
+
+    def make(**settings):
+        from app import MetasploitReconBackend
+
+        defaults = {
+            "DATABASE_URL": f"sqlite:///{tmp_path / 'jobs.db'}",
+            "MSF_CACHE_DIR": tmp_path / "msf-cache",
+            "MSF_CACHE_PREWARM": False,
+            "MSF_RPC_ENABLED": False,
+            "MSF_DB_INGEST": False,
+            "DISTRIBUTED_EXECUTION": False,
+            "MSF_BATCH_MODE": False,
+            "SCAN_NICENESS": 0
+        }
+        for name, value in {**defaults, **settings}.items():
+            monkeypatch.setattr(Config, name, value)
+        backend = MetasploitReconBackend()
+        backend.msf_console_path = str(console)
+        return backend
+
+    return make
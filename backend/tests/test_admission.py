@@ -0,0 +1,26 @@
+"""
+Tests for admission control: a launch that never got memory headroom is
+reported as such and does not shrink the tool's adaptive THREADS
+"""
+
+import asyncio
+
+from admission import Ticket
+from config import Config
+
+
+def test_admission_timeout_is_not_a_tool_timeout(make_backend, tmp_path):
+    backend = make_backend(MSF_MEMORY_BUDGET_MB=100, MSF_LAUNCH_ESTIMATE_MB=100)
+    # Another framework process holds the whole budget
+    backend.admission.tickets.append(Ticket("other-job/tcp-syn-scan"))
+    job_dir = tmp_path / "job"
+    job_dir.mkdir()
+
+    result = asyncio.run(backend.execute_tuned_tool("tcp-syn-scan", "10.0.0.0/24", {}, job_dir, 0.5))
+
+    assert result["success"] is False
+    assert result["admitted"] is False
+    assert result["error"] == "Admission timed out after 0.5s waiting for framework memory"
+    assert list(backend.thread_tuner.threads.values()) == [Config.THREADS_INITIAL]
+    assert not any(backend.thread_tuner.outcomes.values())
+    assert backend.admission.waiting == 0
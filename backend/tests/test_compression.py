@@ -0,0 +1,98 @@
+"""
+Tests for compressed output storage: frames and their index are published by
+one rename, so readers racing a rewrite of the same output always see a
+consistent file
+"""
+
+import gzip
+import json
+import threading
+
+import pytest
+
+from compression import (CHUNK_SIZE, CODEC_SUFFIXES, compress_chunk, default_codec, iter_range, read_stored,
+                         stored_size, write_compressed, zstandard)
+
+CODECS = ["gzip"] + (["zstd"] if zstandard else [])
+# Distinct contents per size, so a reader pairing one write's frames with another's index is caught
+CONTENTS = [bytes([65 + i]) * size for i, size in enumerate([CHUNK_SIZE * 3 + 17, 5, CHUNK_SIZE // 2])]
+
+
+def race(path, codec, read):
+    """Rewrite path from several threads while others read it; returns what the readers raised"""
+    errors = []
+    done = threading.Event()
+
+    def writer(content):
+        try:
+            for _ in range(20):
+                write_compressed(path, content, codec, 1)
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        while not done.is_set():
+            try:
+                read()
+            except Exception as e:
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    writers = [threading.Thread(target=writer, args=(content,)) for content in CONTENTS]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+    return errors
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_concurrent_writes_and_reads(tmp_path, codec):
+    path = tmp_path / "tcp-syn-scan_output.txt"
+    write_compressed(path, CONTENTS[0], codec, 1)
+
+    def read():
+        assert read_stored(path) in CONTENTS
+        assert stored_size(path) in [len(content) for content in CONTENTS]
+        assert b"".join(iter_range(path, 3, 9)) in [content[3:9] for content in CONTENTS]
+
+    assert race(path, codec, read) == []
+    assert read_stored(path) in CONTENTS
+    # One file per output, no temporary files left behind
+    assert [p.name for p in tmp_path.iterdir()] == [path.name + CODEC_SUFFIXES[codec]]
+
+
+def test_stored_file_stays_a_plain_gzip_file(tmp_path):
+    path = tmp_path / "tcp-syn-scan_output.txt"
+    data = b"[+] 10.0.0.1:22 - TCP OPEN\n" * 20000
+    write_compressed(path, data, "gzip", 3)
+    assert gzip.decompress((tmp_path / (path.name + ".gz")).read_bytes()) == data
+
+
+def test_file_without_index_reads_as_missing(tmp_path):
+    path = tmp_path / "tcp-syn-scan_output.txt"
+    write_compressed(path, b"[+] 10.0.0.1:22 - TCP OPEN\n", default_codec(), 3)
+    stored = tmp_path / (path.name + CODEC_SUFFIXES[default_codec()])
+    stored.write_bytes(stored.read_bytes()[:-20])  # e.g. a copy cut short
+
+    assert stored_size(path) is None
+
+
+def test_index_beside_the_frames_is_still_read(tmp_path):
+    # As written before indexes moved into the file
+    path = tmp_path / "tcp-syn-scan_output.txt"
+    data = b"[+] 10.0.0.1:22 - TCP OPEN\n"
+    frame = compress_chunk("gzip", data, 3)
+    (tmp_path / (path.name + ".gz")).write_bytes(frame)
+    (tmp_path / (path.name + ".gz.idx")).write_text(json.dumps(
+        {"codec": "gzip", "chunk_size": CHUNK_SIZE, "size": len(data), "frames": [[0, len(frame)]]}
+    ))
+    assert read_stored(path) == data
+
+    # Truncated by a crash mid-write
+    (tmp_path / (path.name + ".gz.idx")).write_text('{"codec": "gz')
+    assert stored_size(path) is None
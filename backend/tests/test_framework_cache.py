@@ -0,0 +1,37 @@
+"""
+Tests for the framework cache: a boot benchmark cut short by a crash must not
+keep the service from starting
+"""
+
+import asyncio
+import json
+
+from framework_cache import BENCHMARK_FILE, FrameworkCache
+
+FAKE_MSFCONSOLE = "#!/bin/sh\nexit 0\n"
+
+
+def test_truncated_benchmark_is_measured_again(tmp_path):
+    cache_dir = tmp_path / "msf-cache"
+    cache_dir.mkdir()
+    (cache_dir / BENCHMARK_FILE).write_text('{"cold_boot_seconds": 41.')
+    console = tmp_path / "msfconsole"
+    console.write_text(FAKE_MSFCONSOLE)
+    console.chmod(0o755)
+
+    cache = FrameworkCache(cache_dir)
+    assert cache.prepare()
+    assert cache.benchmark == {}
+
+    benchmark = asyncio.run(cache.prewarm(str(console), timeout=10))
+    assert benchmark["cold_boot_seconds"] is not None
+    assert json.loads((cache_dir / BENCHMARK_FILE).read_text()) == benchmark
+    assert not list(cache_dir.glob("*.tmp"))
+
+
+def test_backend_starts_with_a_truncated_benchmark(make_backend, tmp_path):
+    cache_dir = tmp_path / "msf-cache"
+    cache_dir.mkdir()
+    (cache_dir / BENCHMARK_FILE).write_text("{")
+    backend = make_backend(MSF_CACHE_DIR=cache_dir)
+    assert backend.framework_cache.status()["writable"]
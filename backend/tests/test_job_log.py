@@ -0,0 +1,50 @@
+"""
+Tests for the live job log and its replay from stored outputs
+"""
+
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from compression import store_text
+from joblog import read_stored_log
+
+HEADERS = {"Authorization": "Bearer test"}
+
+
+def test_stored_log_numbers_lines_across_outputs(tmp_path):
+    asyncio.run(store_text(tmp_path / "a_output.txt", "one\ntwo\n", "gzip", 3))
+    (tmp_path / "b.shard0_output.txt").write_text("three")
+    (tmp_path / "a.rc").write_text("use auxiliary/x")
+
+    entries = read_stored_log(tmp_path)
+    assert [(e["seq"], e["tool"], e["line"]) for e in entries] == [
+        (1, "a", "one"), (2, "a", "two"), (3, "b.shard0", "three")
+    ]
+    assert [e["seq"] for e in read_stored_log(tmp_path, after=1, limit=1)] == [2]
+
+
+def test_finished_job_drops_live_log_and_replays_outputs(make_backend):
+    backend = make_backend(JOB_LOG_GRACE_SECONDS=0)
+
+    with TestClient(backend.app) as client:
+        response = client.post("/api/jobs", headers=HEADERS, json={
+            "target": "10.0.0.1",
+            "tools": [{"name": "service-version-scan"}]
+        })
+        job_id = response.json()["job_id"]
+
+        deadline = time.monotonic() + 10
+        while client.get(f"/api/jobs/{job_id}").json()["status"] != "completed":
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        while job_id in backend.job_logs:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+        log = client.get(f"/api/jobs/{job_id}/log").json()
+        lines = [entry["line"] for entry in log["entries"]]
+        assert "[*] Scanned 3 of 3 hosts" in lines
+        assert {entry["tool"] for entry in log["entries"]} == {"service-version-scan"}
+        assert [entry["seq"] for entry in log["entries"]] == list(range(1, len(lines) + 1))
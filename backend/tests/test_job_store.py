@@ -0,0 +1,125 @@
+"""
+Tests for job history listing
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import job_store
+from job_store import JobFilter, JobStore, target_range
+
+TARGETS = ["10.0.0.1", "10.0.1.7", "10.1.0.0/24", "192.168.1.5", "localhost"]
+
+
+def make_store(tmp_path, jobs: int = 200) -> JobStore:
+    store = JobStore(str(tmp_path / "jobs.db"), max_jobs=10000)
+    rows = []
+    for i in range(jobs):
+        target = TARGETS[i % len(TARGETS)]
+        start, end = target_range(target)
+        status = "completed" if i % 3 else "failed"
+        rows.append((f"job{i:04d}", target, "P", "u", status, "[]", f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}", start, end))
+    store.writer.executemany(
+        "INSERT INTO jobs (id, target, profile_name, user, status, tools, created_at, target_start, target_end) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    store.total = jobs
+    return store
+
+
+def listed_ids(store: JobStore, filters: JobFilter, limit: int = 20):
+    ids = []
+    after = None
+    while True:
+        page, _ = store.list_jobs(limit, after=after, filters=filters)
+        ids += [row["id"] for row in page]
+        if len(page) < limit:
+            return ids
+        after = (page[-1]["created_at"], page[-1]["id"])
+
+
+def test_only_unfiltered_listing_has_a_total(tmp_path):
+    store = make_store(tmp_path)
+    assert store.list_jobs(10)[1] == 200
+    assert store.list_jobs(10, filters=JobFilter(status="failed"))[1] is None
+
+
+def test_page_size_must_be_positive(tmp_path):
+    store = make_store(tmp_path)
+    for limit in (0, -1):
+        with pytest.raises(ValueError):
+            store.list_jobs(limit)
+
+
+def test_listing_page_size_is_clamped(make_backend, tmp_path):
+    backend = make_backend()
+    (tmp_path / "listing").mkdir()
+    backend.job_store = make_store(tmp_path / "listing")
+    headers = {"Authorization": "Bearer test"}
+    with TestClient(backend.app) as client:
+        page = client.get("/api/jobs?limit=-1", headers=headers).json()
+        assert (page["limit"], len(page["jobs"])) == (1, 1)
+        page = client.get("/api/jobs?limit=100000&offset=-5", headers=headers).json()
+        assert (page["limit"], page["offset"], len(page["jobs"])) == (1000, 0, 200)
+
+
+def test_cidr_listing_is_the_same_through_either_index(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    filters = JobFilter(target="10.0.0.0/8")
+    expected = sorted(
+        (f"job{i:04d}" for i in range(200) if TARGETS[i % len(TARGETS)].startswith("10.")), reverse=True
+    )
+
+    assert listed_ids(store, filters) == expected
+    monkeypatch.setattr(job_store, "RANGE_INDEX_MAX_ROWS", 10)
+    assert listed_ids(store, filters) == expected
+
+
+def test_wide_cidr_listing_walks_the_listing_index(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    monkeypatch.setattr(job_store, "RANGE_INDEX_MAX_ROWS", 10)
+    reader = store._reader()
+    network = JobFilter(target="10.0.0.0/8").network
+    assert not store._few_in_range(reader, network)
+
+    clauses, params = JobFilter(target="10.0.0.0/8").where(range_index=False)
+    plan = " ".join(row[3] for row in reader.execute(
+        f"EXPLAIN QUERY PLAN SELECT * FROM jobs WHERE {' AND '.join(clauses)} "
+        "ORDER BY created_at DESC, id DESC LIMIT 20", params
+    ))
+    assert "idx_jobs_created" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_reads_run_in_worker_threads(tmp_path):
+    store = make_store(tmp_path)
+
+    async def read_concurrently():
+        return await asyncio.gather(*(
+            asyncio.to_thread(store.list_jobs, 5, filters=JobFilter(target=target))
+            for target in TARGETS
+        ))
+
+    pages = asyncio.run(read_concurrently())
+    assert [len(page) for page, _ in pages] == [5] * len(TARGETS)
+    asyncio.run(store.stop())
+    assert store.readers == []
+
+
+def test_history_keeps_the_newest_finished_jobs(tmp_path):
+    expired = []
+    store = JobStore(str(tmp_path / "jobs.db"), max_jobs=3, on_expire=expired.extend)
+    for i in range(5):
+        store.put_job(SimpleNamespace(
+            id=f"job{i}", target="10.0.0.1", profile_name="P", user="u", status="completed", priority=0,
+            force_refresh=False, tools=[], created_at=f"2025-01-01T00:00:0{i}", started_at=None,
+            completed_at=f"2025-01-01T00:01:0{i}", error=None, results=[]
+        ), new=True)
+    asyncio.run(store.flush())
+
+    assert sorted(expired) == ["job0", "job1"]
+    assert [row["id"] for row in store.list_jobs(10)[0]] == ["job4", "job3", "job2"]
+    assert store.status()["stored_jobs"] == 3
@@ -0,0 +1,73 @@
+"""
+Status latency regression test for Metasploit Recon Backend
+Polling a job must stay fast while scans run: console output is pumped
+and parsed off the request path, so 20 concurrently running tools must not
+push the p99 of GET /api/jobs/{id} up.
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+TOOLS = 20
+P99_LIMIT = 0.1  # seconds
+HEADERS = {"Authorization": "Bearer test"}
+
+
+def p99(samples):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+def poll(client, url, seconds):
+    samples = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        response = client.get(url)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200
+    return samples
+
+
+def wait_for(predicate, seconds):
+    deadline = time.monotonic() + seconds
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def test_status_p99_while_20_tools_run(make_backend, monkeypatch):
+    monkeypatch.setenv("FAKE_SCAN_STEP", "1")
+    backend = make_backend(
+        MAX_CONCURRENT_JOBS=TOOLS,
+        MSF_MEMORY_BUDGET_MB=TOOLS * 1024,
+        MSF_LAUNCH_ESTIMATE_MB=1
+    )
+    backend.max_requests_per_minute = TOOLS
+
+    with TestClient(backend.app) as client:
+        job_ids = []
+        for i in range(TOOLS):
+            response = client.post("/api/jobs", headers=HEADERS, json={
+                "target": f"10.0.0.{i + 1}",
+                "tools": [{"name": "service-version-scan"}],
+                "force_refresh": True
+            })
+            assert response.status_code == 200
+            job_ids.append(response.json()["job_id"])
+        url = f"/api/jobs/{job_ids[0]}"
+
+        # Measure only once every console is up
+        wait_for(lambda: len(backend.admission.status()["running"]) == TOOLS, 10)
+
+        samples = poll(client, url, 1.5)
+        assert client.get(url).json()["status"] == "running"
+        assert len(samples) >= 50
+        assert p99(samples) < P99_LIMIT, f"p99 {p99(samples):.3f}s over {len(samples)} polls"
+
+        for job_id in job_ids:
+            wait_for(lambda: client.get(f"/api/jobs/{job_id}").json()["status"] != "running", 30)
+            status = client.get(f"/api/jobs/{job_id}").json()
+            assert status["status"] == "completed", status["error"]
+            assert status["results_count"] == 1
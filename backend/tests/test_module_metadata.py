@@ -0,0 +1,46 @@
+"""
+Tests for submission-time validation of tools and their config values, and
+the module metadata cache behind it
+"""
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from module_metadata import ModuleMetadataCache
+
+HEADERS = {"Authorization": "Bearer test"}
+
+
+def test_unknown_tool_is_rejected_without_module_metadata(tmp_path):
+    metadata = ModuleMetadataCache(str(tmp_path), cache_file=None, store_files=[])
+    assert metadata.validate("nmap-aggressive", {}) == ["nmap-aggressive: unknown tool"]
+    assert metadata.validate("tcp-syn-scan", {"threads": 8}) == []
+
+
+def test_job_with_unknown_tool_gets_422(make_backend):
+    backend = make_backend()
+    with TestClient(backend.app) as client:
+        response = client.post("/api/jobs", headers=HEADERS, json={
+            "target": "10.0.0.1",
+            "tools": [{"name": "tcp-syn-scan"}, {"name": "nmap-aggressive"}]
+        })
+        assert response.status_code == 422
+        assert response.json()["detail"] == ["nmap-aggressive: unknown tool"]
+        assert client.get("/api/jobs").json()["total"] == 0
+
+
+def test_corrupt_cache_file_is_rebuilt(tmp_path):
+    cache_file = tmp_path / "module-metadata.json"
+    metadata = ModuleMetadataCache(str(tmp_path), cache_file=cache_file, store_files=[])
+    modules = asyncio.run(metadata.ensure_loaded())
+    saved = cache_file.read_text()
+    assert json.loads(saved)["modules"] == modules
+
+    # e.g. a crash while the cache was written
+    cache_file.write_text(saved[:len(saved) // 2])
+    reloaded = ModuleMetadataCache(str(tmp_path), cache_file=cache_file, store_files=[])
+    assert asyncio.run(reloaded.ensure_loaded()) == modules
+    assert json.loads(cache_file.read_text())["modules"] == modules
+    assert [path.name for path in tmp_path.iterdir()] == ["module-metadata.json"]
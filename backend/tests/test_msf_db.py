@@ -0,0 +1,165 @@
+"""
+Tests for the framework database connection and ingestion, with SQLite
+standing in for the framework's PostgreSQL database
+"""
+
+import asyncio
+import sqlite3
+import stat
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from framework_cache import FrameworkCache
+from msf_db import MsfDatabase, MsfIngestor, SqliteMsfDatabase, db_connect_command, framework_database_config
+
+HEADERS = {"Authorization": "Bearer test"}
+MSF_DB_URL = "postgresql://msf:p%40ss:w0rd@postgres:5433/metasploit"
+
+STAND_IN_SCHEMA = """
+CREATE TABLE workspaces (id INTEGER PRIMARY KEY, name TEXT UNIQUE);
+CREATE TABLE hosts (id INTEGER PRIMARY KEY, workspace_id INTEGER, address TEXT, mac TEXT,
+                    name TEXT, state TEXT, os_name TEXT, os_flavor TEXT);
+CREATE TABLE services (id INTEGER PRIMARY KEY, host_id INTEGER, port INTEGER, proto TEXT,
+                       state TEXT, name TEXT, info TEXT);
+CREATE TABLE notes (id INTEGER PRIMARY KEY, workspace_id INTEGER, host_id INTEGER, ntype TEXT, data TEXT);
+CREATE TABLE vulns (id INTEGER PRIMARY KEY, host_id INTEGER, name TEXT, info TEXT);
+"""
+
+# Records a host and an open port in the stand-in database, in the workspace
+# the resource script selected, but only when booted with MSF_DATABASE_CONFIG
+FAKE_MSFCONSOLE = '''#!{python}
+import os, sqlite3, sys
+args = sys.argv[1:]
+rc, out = args[args.index("-r") + 1], args[args.index("-o") + 1]
+config = os.environ.get("MSF_DATABASE_CONFIG")
+db = sqlite3.connect({db!r}) if config and "adapter" in open(config).read() else None
+workspace = rhosts = None
+with open(out, "a") as spool:
+    for line in open(rc).read().splitlines():
+        spool.write("msf > " + line + "\\n")
+        if line.startswith("workspace -a ") and db:
+            workspace = line.split()[-1]
+            db.execute("INSERT OR IGNORE INTO workspaces (name) VALUES (?)", (workspace,))
+        elif line.startswith("set RHOSTS "):
+            rhosts = line.split()[-1]
+        elif line == "run" and db and workspace:
+            ws = db.execute("SELECT id FROM workspaces WHERE name = ?", (workspace,)).fetchone()[0]
+            host = db.execute("INSERT INTO hosts (workspace_id, address, state) VALUES (?, ?, 'alive')",
+                              (ws, rhosts)).lastrowid
+            db.execute("INSERT INTO services (host_id, port, proto, state, name) VALUES (?, 22, 'tcp', 'open', 'ssh')",
+                       (host,))
+            db.commit()
+            spool.write("[+] " + rhosts + ":22 - TCP OPEN\\n")
+'''
+
+
+def test_framework_database_config_from_url():
+    config = framework_database_config(MSF_DB_URL, pool_size=3)
+    assert config == {
+        "adapter": "postgresql",
+        "database": "metasploit",
+        "username": "msf",
+        "password": "p@ss:w0rd",
+        "host": "postgres",
+        "port": 5433,
+        "pool": 3,
+        "timeout": 5
+    }
+    assert db_connect_command(config) == "db_connect msf:p@ss:w0rd@postgres:5433/metasploit"
+    # The framework cannot use the SQLite stand-in
+    assert framework_database_config("sqlite:///msf.db") is None
+
+
+def test_database_yml_is_private_and_passed_to_launches(tmp_path):
+    cache = FrameworkCache(tmp_path, framework_database_config(MSF_DB_URL))
+    assert cache.prepare()
+
+    database_file = tmp_path / ".msf4" / "database.yml"
+    assert cache.env()["MSF_DATABASE_CONFIG"] == str(database_file)
+    assert stat.S_IMODE(database_file.stat().st_mode) == 0o600
+    lines = database_file.read_text().splitlines()
+    assert lines[0] == "production:"
+    assert '  password: "p@ss:w0rd"' in lines
+
+    plain = FrameworkCache(tmp_path / "plain")
+    plain.prepare()
+    assert "MSF_DATABASE_CONFIG" not in plain.env()
+
+
+def test_console_connects_itself_when_not_booted_connected(make_backend):
+    backend = make_backend(MSF_DB_INGEST=True, MSF_DB_URL=MSF_DB_URL)
+    backend.framework_cache.database_file = None  # e.g. a read-only cache dir
+    assert backend.workspace_commands("recon-1") == [
+        "db_connect msf:p@ss:w0rd@postgres:5433/metasploit",
+        "workspace -a recon-1"
+    ]
+
+
+def test_tool_findings_are_ingested_from_the_job_workspace(make_backend, tmp_path):
+    db_path = tmp_path / "msf.db"
+    with sqlite3.connect(db_path) as db:
+        db.executescript(STAND_IN_SCHEMA)
+    backend = make_backend(MSF_DB_INGEST=True, MSF_DB_URL=MSF_DB_URL)
+    assert backend.workspace_commands("recon-1") == ["workspace -a recon-1"]
+    # PostgreSQL is stood in for by SQLite on both sides of the framework
+    backend.msf_ingestor = MsfIngestor(SqliteMsfDatabase(str(db_path)))
+    console = tmp_path / "msfconsole-db"
+    console.write_text(FAKE_MSFCONSOLE.format(python=sys.executable, db=str(db_path)))
+    console.chmod(0o755)
+    backend.msf_console_path = str(console)
+
+    with TestClient(backend.app) as client:
+        response = client.post("/api/jobs", headers=HEADERS, json={
+            "target": "10.0.0.9",
+            "tools": [{"name": "tcp-syn-scan"}, {"name": "smb-enum"}]
+        })
+        job_id = response.json()["job_id"]
+        deadline = time.monotonic() + 20
+        while client.get(f"/api/jobs/{job_id}").json()["status"] in ("pending", "running"):
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        results = client.get(f"/api/jobs/{job_id}/results").json()["results"]
+
+    assert [entry["result"].get("msf_db_error") for entry in results] == [None, None]
+    hosts = [row for entry in results for row in entry["result"]["msf_db"]["hosts"]]
+    services = [row for entry in results for row in entry["result"]["msf_db"]["services"]]
+    # Each run's rows are attributed once, to the tool that recorded them
+    assert [row["address"] for row in hosts] == ["10.0.0.9", "10.0.0.9"]
+    assert [(row["port"], row["name"]) for row in services] == [(22, "ssh"), (22, "ssh")]
+    # Both tools ran in one stage, each in its own workspace
+    with sqlite3.connect(db_path) as db:
+        assert sorted(db.execute("SELECT name FROM workspaces").fetchall()) == [
+            (f"recon-{job_id}-0",), (f"recon-{job_id}-1",)
+        ]
+    assert backend.msf_ingestor.watermarks == {}
+
+
+def test_concurrent_tool_runs_get_only_their_own_rows(tmp_path):
+    db_path = tmp_path / "msf.db"
+    with sqlite3.connect(db_path) as db:
+        db.executescript(STAND_IN_SCHEMA)
+    ingestor = MsfIngestor(SqliteMsfDatabase(str(db_path)))
+
+    async def run():
+        await ingestor.database.connect()
+        with sqlite3.connect(db_path) as db:
+            # Two tools of one stage record before either is ingested
+            for run, address in enumerate(["10.0.0.1", "10.0.0.2"]):
+                ws = db.execute("INSERT INTO workspaces (name) VALUES (?)",
+                                (ingestor.workspace_name("job1", run),)).lastrowid
+                db.execute("INSERT INTO hosts (workspace_id, address) VALUES (?, ?)", (ws, address))
+        return await asyncio.gather(ingestor.ingest("job1", 1), ingestor.ingest("job1", 0))
+
+    second, first = asyncio.run(run())
+    assert [row["address"] for row in first["hosts"]] == ["10.0.0.1"]
+    assert [row["address"] for row in second["hosts"]] == ["10.0.0.2"]
+    ingestor.forget("job1")
+    assert (ingestor.workspace_ids, ingestor.watermarks, ingestor.locks) == ({}, {}, {})
+
+
+def test_database_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        MsfDatabase()
@@ -0,0 +1,186 @@
+"""
+MsfRpcPool and MsfConsole against a local stand-in msgrpc server
+"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import msgpack
+import pytest
+
+from msf_rpc import MsfRpcError, MsfRpcPool
+
+
+class FakeMsgRpc:
+    """In-process msgrpc server: MessagePack over HTTP, one console per console.create"""
+
+    def __init__(self):
+        self.logins = 0
+        self.healthy = True
+        self.consoles = {}
+        self.next_console = 0
+        # Reads after console.write: (data, busy) pairs, then idle
+        self.script = [("[*] Scanned 1 of 2 hosts\n", True), ("", True), ("[*] Scanned 2 of 2 hosts\n", True)]
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = msgpack.unpackb(self.rfile.read(int(self.headers["Content-Length"])), raw=False)
+                body = msgpack.packb(fake.handle(request[0], request[1:]), use_bin_type=True)
+                self.send_response(200)
+                self.send_header("Content-Type", "binary/message-pack")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, method, args):
+        if method == "auth.login":
+            if args != ["msf", "secret"]:
+                return {"error": True, "error_message": "Login Failed"}
+            self.logins += 1
+            return {"result": "success", "token": f"token-{self.logins}"}
+        if method == "core.version":
+            if not self.healthy:
+                return {"error": True, "error_message": "Framework unavailable"}
+            return {"version": "6.4.0"}
+        if method == "console.create":
+            console_id = str(self.next_console)
+            self.next_console += 1
+            self.consoles[console_id] = [("msf6 > banner\n", False)]
+            return {"id": console_id}
+        if method == "console.write":
+            self.consoles[args[1]] = list(self.script)
+            return {"wrote": len(args[2])}
+        if method == "console.read":
+            pending = self.consoles.get(args[1])
+            data, busy = pending.pop(0) if pending else ("", False)
+            return {"data": data, "busy": busy, "prompt": "msf6 > "}
+        if method == "console.destroy":
+            self.consoles.pop(args[1], None)
+            return {"result": "success"}
+        return {"error": True, "error_message": f"Unknown method {method}"}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_rpc():
+    fake = FakeMsgRpc()
+    yield fake
+    fake.close()
+
+
+def make_pool(fake, **kwargs):
+    return MsfRpcPool(size=1, host="127.0.0.1", base_port=fake.port, username="msf", password="secret", **kwargs)
+
+
+def test_lease_hands_each_worker_to_one_holder(fake_rpc):
+    async def main():
+        pool = make_pool(fake_rpc)
+        await pool.start()
+        events = []
+
+        async def lease(name):
+            async with pool.console() as console:
+                events.append((name, "in", console.id))
+                await asyncio.sleep(0.05)
+                events.append((name, "out", console.id))
+
+        await asyncio.gather(lease("a"), lease("b"))
+        await pool.stop()
+        return events
+
+    events = asyncio.run(main())
+    # The single worker is never leased twice at once, and every lease gets a fresh console
+    assert [event[:2] for event in events] == [("a", "in"), ("a", "out"), ("b", "in"), ("b", "out")]
+    assert events[0][2] != events[2][2]
+    assert fake_rpc.consoles == {}
+
+
+def test_unhealthy_worker_is_restarted_before_lease(fake_rpc):
+    async def main():
+        pool = make_pool(fake_rpc)
+        await pool.start()
+        fake_rpc.healthy = False
+        logins_before = fake_rpc.logins
+        try:
+            async with pool.console():
+                pass
+        finally:
+            await pool.stop()
+        return logins_before
+
+    logins_before = asyncio.run(main())
+    assert fake_rpc.logins == logins_before + 1
+
+
+def test_worker_recycled_after_max_uses(fake_rpc):
+    async def main():
+        pool = make_pool(fake_rpc, max_uses=2)
+        await pool.start()
+        worker = pool.workers[0]
+        uses = []
+        for _ in range(3):
+            async with pool.console():
+                pass
+            uses.append(worker.uses)
+        await pool.stop()
+        return uses
+
+    uses = asyncio.run(main())
+    # Second lease hits max_uses: the worker restarts (logs in again) and its count resets
+    assert uses == [1, 0, 1]
+    assert fake_rpc.logins == 2
+
+
+def test_console_run_collects_output_until_idle(fake_rpc):
+    async def main():
+        pool = make_pool(fake_rpc)
+        await pool.start()
+        lines = []
+        async with pool.console() as console:
+            output = await console.run(["use auxiliary/scanner/portscan/tcp", "run"], timeout=5,
+                                       poll_interval=0.01, on_line=lines.append)
+        await pool.stop()
+        return output, lines
+
+    output, lines = asyncio.run(main())
+    # The banner was discarded on open; an empty busy read does not end the run
+    assert output == "[*] Scanned 1 of 2 hosts\n[*] Scanned 2 of 2 hosts\n"
+    assert lines == ["[*] Scanned 1 of 2 hosts", "[*] Scanned 2 of 2 hosts"]
+
+
+def test_console_run_times_out_while_busy(fake_rpc):
+    fake_rpc.script = [("[*] Running\n", True)] + [("", True)] * 1000
+
+    async def main():
+        pool = make_pool(fake_rpc)
+        await pool.start()
+        try:
+            async with pool.console() as console:
+                await console.run(["run"], timeout=0.2, poll_interval=0.01)
+        finally:
+            await pool.stop()
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+
+
+def test_bad_credentials_fail_startup(fake_rpc):
+    async def main():
+        pool = MsfRpcPool(size=1, host="127.0.0.1", base_port=fake_rpc.port, username="msf", password="wrong")
+        pool.workers[0].startup_timeout = 0
+        await pool.start()
+
+    with pytest.raises(MsfRpcError):
+        asyncio.run(main())
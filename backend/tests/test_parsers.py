@@ -0,0 +1,156 @@
+"""
+Tests for module output parsers, on console output as the modules print it
+"""
+
+from parsers import PARSERS, parse_output
+from tools import MODULE_MAPPING
+
+TCP_PORTSCAN = """\
+[*] 10.0.0.5:              - 10.0.0.5:22 - TCP OPEN
+[+] 10.0.0.5:              - 10.0.0.5:80 - TCP OPEN
+[-] 10.0.0.6:              - 10.0.0.6:445 - Rex::ConnectionRefused
+[*] 10.0.0.0/30:           - Scanned 1 of 4 hosts (25% complete)
+[*] Auxiliary module execution completed
+"""
+
+SYN_PORTSCAN = """\
+[+]  TCP OPEN 10.0.0.5:22
+[+]  TCP OPEN 10.0.0.5:443
+[*] Scanned 1 of 1 hosts (100% complete)
+"""
+
+UDP_SWEEP = """\
+[*] Sending 13 probes to 10.0.0.0->10.0.0.255 (256 hosts)
+[*] Discovered NetBIOS on 10.0.0.7:137 (WS01:<00>:U :WORKGROUP:<00>:G :00:0c:29:aa:bb:cc)
+[+] Discovered SNMP on 10.0.0.7:161 (Linux ws01 5.15.0-91-generic #101-Ubuntu SMP x86_64)
+[+] Discovered DNS on 10.0.0.1:53 (BIND 9.16.1-Ubuntu)
+[*] Scanned 256 of 256 hosts (100% complete)
+"""
+
+SMB_ENUMSHARES = """\
+[+] 10.0.0.20:445 - ADMIN$ - (DISK|SPECIAL) Remote Admin
+[+] 10.0.0.20:445 - IPC$ - (IPC|SPECIAL) Remote IPC
+[+] 10.0.0.20:445 - public - (DISK) 
+[-] 10.0.0.21:445 - Login Failed: The SMB server did not reply to our request
+[*] 10.0.0.20: - Scanned 1 of 2 hosts (50% complete)
+"""
+
+SNMP_ENUM = """\
+[+] 10.0.0.30, Connected.
+
+[*] System information:
+
+Host IP                       : 10.0.0.30
+Hostname                      : printer01
+Description                   : HP ETHERNET MULTI-ENVIRONMENT
+Location                      : Lab 2
+Uptime snmp                   : 12 days, 03:04:05.06
+
+[*] Scanned 1 of 1 hosts (100% complete)
+"""
+
+DNS_ENUM = """\
+[*] querying DNS NS records for example.com
+[+] example.com NS: a.iana-servers.net.
+[*] querying DNS A records for example.com
+[+] example.com A: 93.184.216.34
+[+] example.com. 3600 IN MX 10 mail.example.com.
+[-] Could not resolve www2.example.com
+"""
+
+CRAWL = """\
+[*] Crawling http://10.0.0.40:80/...
+[*] [00001/00500]    200 - 10.0.0.40 - http://10.0.0.40/
+[*] [00002/00500]    404 - 10.0.0.40 - http://10.0.0.40/missing
+[*] [00003/00500]    200 - 10.0.0.40 - http://10.0.0.40/
+[*] Crawl of http://10.0.0.40:80/ complete
+"""
+
+HTTP_VERSION = """\
+[+] 10.0.0.40:80 Apache/2.4.41 (Ubuntu) ( Powered by PHP/7.4.3 )
+[+] 10.0.0.41:8080 nginx/1.18.0
+[-] 10.0.0.42:80 - Connection refused
+[*] 10.0.0.43:80 - Scanned 3 of 4 hosts (75% complete)
+[+] 10.0.0.44:80 - Unable to fingerprint
+[*] Auxiliary module execution completed
+"""
+
+
+def test_every_mapped_module_has_a_parser():
+    assert set(MODULE_MAPPING.values()) <= set(PARSERS)
+
+
+def test_tcp_portscan():
+    assert parse_output("auxiliary/scanner/portscan/tcp", TCP_PORTSCAN) == [
+        {"host": "10.0.0.5", "port": 22, "proto": "tcp", "state": "open", "type": "port"},
+        {"host": "10.0.0.5", "port": 80, "proto": "tcp", "state": "open", "type": "port"}
+    ]
+
+
+def test_syn_portscan():
+    assert [(r["host"], r["port"]) for r in parse_output("auxiliary/scanner/portscan/syn", SYN_PORTSCAN)] == [
+        ("10.0.0.5", 22), ("10.0.0.5", 443)
+    ]
+
+
+def test_udp_sweep():
+    parsed = parse_output("auxiliary/scanner/discovery/udp_sweep", UDP_SWEEP)
+    assert [r["host"] for r in parsed if r["type"] == "host"] == ["10.0.0.7", "10.0.0.1"]
+    ports = [r for r in parsed if r["type"] == "port"]
+    assert [(r["host"], r["port"], r["service"]) for r in ports] == [
+        ("10.0.0.7", 137, "netbios"), ("10.0.0.7", 161, "snmp"), ("10.0.0.1", 53, "dns")
+    ]
+    assert ports[2]["banner"] == "BIND 9.16.1-Ubuntu"
+
+
+def test_smb_enumshares():
+    parsed = parse_output("auxiliary/scanner/smb/smb_enumshares", SMB_ENUMSHARES)
+    assert [(r["host"], r["share"], r["share_type"]) for r in parsed] == [
+        ("10.0.0.20", "ADMIN$", "DISK|SPECIAL"), ("10.0.0.20", "IPC$", "IPC|SPECIAL"), ("10.0.0.20", "public", "DISK")
+    ]
+    assert parsed[0]["comment"] == "Remote Admin"
+    assert "comment" not in parsed[2]
+
+
+def test_snmp_enum():
+    assert parse_output("auxiliary/scanner/snmp/snmp_enum", SNMP_ENUM) == [{
+        "host": "10.0.0.30",
+        "state": "up",
+        "type": "host",
+        "info": {
+            "Host IP": "10.0.0.30",
+            "Hostname": "printer01",
+            "Description": "HP ETHERNET MULTI-ENVIRONMENT",
+            "Location": "Lab 2",
+            "Uptime snmp": "12 days, 03:04:05.06"
+        }
+    }]
+
+
+def test_dns_enum():
+    parsed = parse_output("auxiliary/gather/dns_enum", DNS_ENUM)
+    assert [(r["name"], r["record_type"], r["value"]) for r in parsed] == [
+        ("example.com", "NS", "a.iana-servers.net."),
+        ("example.com", "A", "93.184.216.34"),
+        ("example.com.", "MX", "10 mail.example.com.")
+    ]
+
+
+def test_crawl():
+    assert parse_output("auxiliary/scanner/http/crawl", CRAWL) == [
+        {"url": "http://10.0.0.40/", "host": "10.0.0.40", "status": 200, "type": "url"},
+        {"url": "http://10.0.0.40/missing", "host": "10.0.0.40", "status": 404, "type": "url"}
+    ]
+
+
+def test_http_version_only_reads_fingerprints():
+    parsed = parse_output("auxiliary/scanner/http/http_version", HTTP_VERSION)
+    assert [(r["host"], r["port"], r["banner"]) for r in parsed] == [
+        ("10.0.0.40", 80, "Apache/2.4.41 (Ubuntu) ( Powered by PHP/7.4.3 )"),
+        ("10.0.0.41", 8080, "nginx/1.18.0")
+    ]
+
+
+def test_unknown_module_and_empty_output():
+    assert parse_output("auxiliary/scanner/unknown", HTTP_VERSION) == []
+    assert parse_output("auxiliary/scanner/http/http_version", "") == []
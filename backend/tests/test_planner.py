@@ -0,0 +1,51 @@
+"""
+Tests for job planning: a tool requested twice with different options runs
+twice, each run with its own workspace files
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from planner import plan_job
+
+HEADERS = {"Authorization": "Bearer test"}
+
+
+def test_repeated_tools_get_their_own_file_stems():
+    plan = plan_job([
+        {"name": "tcp-syn-scan", "config": {"threads": 2}},
+        {"name": "smb-enum"},
+        {"name": "tcp-syn-scan", "config": {"threads": 4}}
+    ], "10.0.0.1")
+    assert [node.file_stem for node in plan] == ["tcp-syn-scan.0", "smb-enum", "tcp-syn-scan.2"]
+    # Different options: both run, in the same stage
+    assert [node.shares_run_of for node in plan] == [None, None, None]
+    assert plan[0].stage == plan[2].stage
+
+
+def test_concurrent_runs_of_one_tool_keep_their_outputs_apart(make_backend):
+    backend = make_backend()
+    with TestClient(backend.app) as client:
+        job_id = client.post("/api/jobs", headers=HEADERS, json={
+            "target": "10.0.0.1",
+            "tools": [{"name": "tcp-syn-scan", "config": {"threads": 2}},
+                      {"name": "tcp-syn-scan", "config": {"threads": 4}}]
+        }).json()["job_id"]
+        deadline = time.monotonic() + 20
+        while client.get(f"/api/jobs/{job_id}").json()["status"] in ("pending", "running"):
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        results = client.get(f"/api/jobs/{job_id}/results", headers=HEADERS).json()["results"]
+        outputs = {name: client.get(f"/api/jobs/{job_id}/output/{name}", headers=HEADERS).text
+                   for name in ("tcp-syn-scan.0", "tcp-syn-scan.1")}
+
+    for entry in results:
+        result = entry["result"]
+        threads = result["threads"]
+        assert result["success"], result
+        assert f"set THREADS {threads}" in result["output"]
+        assert f"set THREADS {6 - threads}" not in result["output"]
+        assert result["output"].count("[*] Scanned 3 of 3 hosts") == 1
+        assert outputs[result["output_name"]] == result["output"]
+    assert sorted(entry["result"]["output_name"] for entry in results) == ["tcp-syn-scan.0", "tcp-syn-scan.1"]
@@ -0,0 +1,56 @@
+"""
+Tests for child process output pumping
+"""
+
+import asyncio
+
+from processes import pump_lines
+
+
+def pump(data: bytes, on_line, chunk_size: int = 1024):
+    async def run():
+        stream = asyncio.StreamReader()
+        stream.feed_data(data)
+        stream.feed_eof()
+        await pump_lines(stream, on_line, chunk_size)
+    asyncio.run(run())
+
+
+def test_lines_split_across_chunks():
+    lines = []
+    pump(b"first\r\nsecond line\nlast", lines.append, chunk_size=16)
+    assert lines == ["first", "second line", "last"]
+
+
+def test_overlong_line_is_logged_in_pieces():
+    lines = []
+    pump(b"x" * 100_000 + b"\nafter\n", lines.append, chunk_size=64 * 1024)
+    assert "".join(lines[:-1]) == "x" * 100_000
+    assert all(len(line) <= 64 * 1024 for line in lines)
+    assert lines[-1] == "after"
+
+
+def test_failing_consumer_does_not_stop_draining():
+    seen = []
+
+    def on_line(line):
+        seen.append(line)
+        raise RuntimeError("log is broken")
+
+    pump(b"".join(b"line %d\n" % i for i in range(5000)), on_line)
+    assert len(seen) == 5000
+
+
+def test_subprocess_with_long_line_finishes():
+    async def run():
+        process = await asyncio.create_subprocess_exec(
+            "python3", "-c", "print('y' * 200000); print('done')",
+            stdout=asyncio.subprocess.PIPE
+        )
+        lines = []
+        await asyncio.wait_for(pump_lines(process.stdout, lines.append), 10)
+        await process.wait()
+        return lines
+    lines = asyncio.run(run())
+    assert "".join(lines[:-1]) == "y" * 200000
+    assert lines[-1] == "done"
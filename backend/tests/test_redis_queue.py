@@ -0,0 +1,166 @@
+"""
+Tests for the Redis task queue and remote tool runs, against in-process fakeredis
+"""
+
+import asyncio
+import json
+import time
+
+import fakeredis.aioredis
+import pytest
+
+from config import Config
+from redis_queue import EVENTS_TTL, LEASES_KEY, PROCESSING_KEY, TASKS_KEY, RedisTaskQueue
+
+
+def make_queue(**kwargs) -> RedisTaskQueue:
+    return RedisTaskQueue(fakeredis.aioredis.FakeRedis(decode_responses=True), **kwargs)
+
+
+async def drain(queue: RedisTaskQueue, task_id: str):
+    return await queue.next_events(task_id, timeout=1)
+
+
+def test_claim_leases_the_task_and_reports_start():
+    async def run():
+        queue = make_queue(lease_seconds=30)
+        task_id = await queue.submit({"tool": "tcp-syn-scan"}, ttl=60)
+        task = await queue.claim(timeout=1, worker="node-1")
+        assert task == {"tool": "tcp-syn-scan", "task_id": task_id}
+        assert await queue.redis.lrange(PROCESSING_KEY, 0, -1) == [task_id]
+        assert await queue.redis.zscore(LEASES_KEY, task_id) > time.time() + 25
+        assert await drain(queue, task_id) == [{"kind": "started", "worker": "node-1", "attempt": 1}]
+        # One task, one holder
+        assert await queue.claim(timeout=1) is None
+    asyncio.run(run())
+
+
+def test_heartbeat_extends_the_lease_until_cancelled_or_lost():
+    async def run():
+        queue = make_queue(lease_seconds=30)
+        task_id = await queue.submit({}, ttl=60)
+        await queue.claim(timeout=1)
+        await queue.redis.zadd(LEASES_KEY, {task_id: time.time() + 1})
+
+        assert await queue.heartbeat(task_id) == "ok"
+        assert await queue.redis.zscore(LEASES_KEY, task_id) > time.time() + 25
+        await queue.request_cancel(task_id)
+        assert await queue.heartbeat(task_id) == "cancelled"
+        await queue.redis.zrem(LEASES_KEY, task_id)
+        assert await queue.heartbeat(task_id) == "lost"
+    asyncio.run(run())
+
+
+def test_expired_lease_is_requeued_then_failed_after_max_attempts():
+    async def run():
+        queue = make_queue(lease_seconds=30, max_attempts=2)
+        task_id = await queue.submit({}, ttl=60)
+        for attempt in (1, 2):
+            assert (await queue.claim(timeout=1))["task_id"] == task_id
+            # The worker died: its lease runs out without a heartbeat
+            await queue.redis.zadd(LEASES_KEY, {task_id: time.time() - 1})
+            assert await queue.requeue_expired() == (1 if attempt == 1 else 0)
+
+        events = await drain(queue, task_id)
+        assert [event["kind"] for event in events] == ["started", "started", "result"]
+        assert events[-1]["result"]["error"] == "Worker lost after 2 attempts"
+        assert await queue.redis.llen(TASKS_KEY) == 0
+        assert await queue.redis.llen(PROCESSING_KEY) == 0
+    asyncio.run(run())
+
+
+def test_task_claimed_but_never_leased_is_requeued_on_the_second_sweep():
+    async def run():
+        queue = make_queue()
+        task_id = await queue.submit({}, ttl=60)
+        # A worker died between BLMOVE and ZADD
+        await queue.redis.lmove(TASKS_KEY, PROCESSING_KEY, "RIGHT", "LEFT")
+        assert await queue.requeue_expired() == 0
+        assert await queue.requeue_expired() == 1
+        assert await queue.redis.lrange(TASKS_KEY, 0, -1) == [task_id]
+    asyncio.run(run())
+
+
+def test_task_hash_expires_once_nobody_waits_for_it():
+    async def run():
+        queue = make_queue()
+        task_id = await queue.submit({}, ttl=60)
+        task_key = f"recon:task:{task_id}"
+        assert 60 < await queue.redis.ttl(task_key) <= 60 + EVENTS_TTL
+
+        # The submitter gave up on a claimed task: the worker finishes it, nobody collects
+        await queue.claim(timeout=1)
+        await queue.request_cancel(task_id)
+        assert 0 < await queue.redis.ttl(task_key) <= EVENTS_TTL
+        await queue.complete(task_id, {"success": False, "output": ""})
+        assert 0 < await queue.redis.ttl(task_key) <= EVENTS_TTL
+        assert await queue.redis.zscore(LEASES_KEY, task_id) is None
+
+        # Cancelled while queued: gone at once, and a racing claim leaves nothing behind
+        task_id = await queue.submit({}, ttl=60)
+        await queue.request_cancel(task_id)
+        await queue.redis.lpush(TASKS_KEY, task_id)
+        assert await queue.claim(timeout=1) is None
+        assert await queue.redis.exists(f"recon:task:{task_id}") == 0
+    asyncio.run(run())
+
+
+@pytest.fixture
+def remote_backend(make_backend, monkeypatch):
+    monkeypatch.setattr(Config, "TASK_LEASE_SECONDS", 1)
+    monkeypatch.setattr(Config, "TASK_QUEUE_TIMEOUT", 30)
+    backend = make_backend()
+    backend.task_queue = make_queue(lease_seconds=1)
+    return backend
+
+
+def test_remote_timeout_starts_when_a_worker_claims(remote_backend, tmp_path):
+    queue = remote_backend.task_queue
+
+    async def busy_worker():
+        # Queued behind other work for longer than timeout + 2 leases
+        await asyncio.sleep(4)
+        task = await queue.claim(timeout=1, worker="node-1")
+        await queue.publish_lines(task["task_id"], ["[*] Scanned 1 of 1 hosts"])
+        await asyncio.sleep(1.5)
+        await queue.complete(task["task_id"], {"success": True, "output": "done"})
+
+    async def run():
+        lines = []
+        worker = asyncio.create_task(busy_worker())
+        result = await remote_backend.execute_remote_tool(
+            "tcp-syn-scan", "10.0.0.1", {}, tmp_path / "job", 1.0, None, lines.append, None
+        )
+        await worker
+        return result, lines
+
+    result, lines = asyncio.run(run())
+    assert result == {"success": True, "output": "done", "executor": "remote"}
+    assert lines == ["[*] Scanned 1 of 1 hosts"]
+
+
+def test_remote_run_gives_up_after_timeout_from_claim(remote_backend, tmp_path):
+    queue = remote_backend.task_queue
+
+    async def hung_worker():
+        task = None
+        while task is None:
+            task = await queue.claim(timeout=1)
+        while await queue.heartbeat(task["task_id"]) == "ok":
+            await asyncio.sleep(0.2)
+
+    async def run():
+        worker = asyncio.create_task(hung_worker())
+        started = time.monotonic()
+        result = await remote_backend.execute_remote_tool(
+            "tcp-syn-scan", "10.0.0.1", {}, tmp_path / "job", 1.0, None, None, None
+        )
+        elapsed = time.monotonic() - started
+        # The worker sees the cancel on its next heartbeat
+        await asyncio.wait_for(worker, 5)
+        return result, elapsed
+
+    result, elapsed = asyncio.run(run())
+    assert result["error"] == "No worker result after 1s"
+    # timeout + 2 leases from the claim, give or take one event poll
+    assert 3 <= elapsed < 7
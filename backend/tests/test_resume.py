@@ -0,0 +1,18 @@
+"""
+Tests for re-running tools of jobs resumed after a restart
+"""
+
+import asyncio
+
+
+def test_rerun_does_not_inherit_a_stale_spool(make_backend, tmp_path):
+    backend = make_backend()
+    job_dir = tmp_path / "workspace" / "job-1"
+    job_dir.mkdir()
+    # Left by a run that was interrupted before its output was stored
+    (job_dir / "tcp-syn-scan_output.txt").write_text("[*] Scanned 2 of 3 hosts\nSTALE\n")
+
+    result = asyncio.run(backend.execute_metasploit_tool("tcp-syn-scan", "10.0.0.1", {}, job_dir, 30))
+    assert result["success"], result
+    assert "STALE" not in result["output"]
+    assert result["output"].count("[*] Scanned 3 of 3 hosts") == 1
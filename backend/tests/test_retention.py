@@ -0,0 +1,95 @@
+"""
+Tests for result retention and the result cache: spills reference the
+console output stored in the workspace and count it against the storage
+budget, and cached results are bounded by size
+"""
+
+import asyncio
+import json
+
+from compression import default_codec, read_stored, write_compressed
+from result_cache import ResultCache, result_bytes
+from retention import ResultRetention
+
+OUTPUT = "".join(f"[+] 10.0.0.{i}:22 - TCP OPEN\n" for i in range(1, 200))
+
+
+def spill_entry(output):
+    return {"tool": "tcp-syn-scan", "result": {"success": True, "output": output, "records": [{"port": 22}]}}
+
+
+def test_spill_references_stored_output(tmp_path):
+    codec = default_codec()
+    job_dir = tmp_path / "job-1"
+    job_dir.mkdir()
+    write_compressed(job_dir / "tcp-syn-scan_output.txt", OUTPUT.encode(), codec, 3)
+    write_compressed(job_dir / "tcp-syn-scan.shard0_output.txt", OUTPUT.encode(), codec, 3)
+    retention = ResultRetention(tmp_path, 1024 * 1024, codec)
+
+    summary = asyncio.run(retention.spill("job-1", spill_entry(OUTPUT)))
+    spilled = summary["result"]["spilled"]
+    assert "output" not in summary["result"]
+    assert spilled["output_file"] == "tcp-syn-scan_output.txt"
+    # The spill holds the other fields only
+    assert json.loads(read_stored(job_dir / spilled["file"])) == {"records": [{"port": 22}]}
+    # Outputs (shards and frame indexes included) count against the storage budget
+    stored = sum(path.stat().st_size for path in job_dir.rglob("*") if path.is_file())
+    assert spilled["bytes"] == stored
+
+    retention.cache.clear()  # read back from disk
+    [hydrated] = asyncio.run(retention.hydrate("job-1", [summary]))
+    assert hydrated["result"]["output"] == OUTPUT
+    assert hydrated["result"]["records"] == [{"port": 22}]
+    assert retention.status()["misses"] == 1
+
+
+def test_spill_copies_output_that_differs_from_the_stored_file(tmp_path):
+    job_dir = tmp_path / "job-1"
+    job_dir.mkdir()
+    # e.g. a batch run's demultiplexed section, or output with no file at all
+    (job_dir / "tcp-syn-scan_output.txt").write_text(OUTPUT + "msf > exit\n")
+    retention = ResultRetention(tmp_path, 1024 * 1024)
+
+    summary = asyncio.run(retention.spill("job-1", spill_entry(OUTPUT)))
+    spilled = summary["result"]["spilled"]
+    assert "output_file" not in spilled
+    assert json.loads((job_dir / spilled["file"]).read_text())["output"] == OUTPUT
+
+    retention.cache.clear()
+    [hydrated] = asyncio.run(retention.hydrate("job-1", [summary]))
+    assert hydrated["result"]["output"] == OUTPUT
+
+
+def test_missing_referenced_output_is_reported(tmp_path):
+    job_dir = tmp_path / "job-1"
+    job_dir.mkdir()
+    (job_dir / "tcp-syn-scan_output.txt").write_text(OUTPUT)
+    retention = ResultRetention(tmp_path, 1024 * 1024)
+    summary = asyncio.run(retention.spill("job-1", spill_entry(OUTPUT)))
+
+    retention.cache.clear()
+    (job_dir / "tcp-syn-scan_output.txt").unlink()
+    [hydrated] = asyncio.run(retention.hydrate("job-1", [summary]))
+    assert hydrated["result"]["output"] == ""
+    assert "spill_error" in hydrated["result"]
+
+
+def test_result_cache_is_bounded_by_bytes():
+    result = {"success": True, "output": "x" * 1000, "records": []}
+    size = result_bytes(result)
+    cache = ResultCache({}, max_entries=100, max_bytes=3 * size)
+
+    for i in range(5):
+        cache.put("tcp-syn-scan", f"10.0.0.{i}", {}, dict(result))
+    assert len(cache.entries) == 3
+    assert cache.total_bytes == 3 * size
+    # The least recently used results went first
+    assert cache.get("tcp-syn-scan", "10.0.0.1", {}) is None
+    assert cache.get("tcp-syn-scan", "10.0.0.4", {})["cached"]
+
+    # Replacing an entry does not count it twice; oversized results are not cached
+    cache.put("tcp-syn-scan", "10.0.0.4", {}, dict(result))
+    assert cache.total_bytes == 3 * size
+    cache.put("tcp-syn-scan", "10.0.0.9", {}, {"success": True, "output": "x" * 4 * size})
+    assert cache.get("tcp-syn-scan", "10.0.0.9", {}) is None
+    assert len(cache.entries) == 3
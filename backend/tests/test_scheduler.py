@@ -0,0 +1,42 @@
+"""
+Tests for load shedding when the job queue is full
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from scheduler import QueueFullError
+
+HEADERS = {"Authorization": "Bearer test"}
+REQUEST = {"target": "10.0.0.1", "tools": [{"name": "tcp-syn-scan"}]}
+
+
+def test_full_queue_rejects_before_persisting(make_backend, tmp_path):
+    backend = make_backend(MAX_PENDING_JOBS=0)
+    with TestClient(backend.app) as client:
+        response = client.post("/api/jobs", headers=HEADERS, json=REQUEST)
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        asyncio.run(backend.job_store.flush())
+        assert client.get("/api/jobs").json()["jobs"] == []
+    assert list((tmp_path / "workspace").iterdir()) == []
+
+
+def test_job_rejected_after_persisting_is_failed_not_pending(make_backend, monkeypatch):
+    backend = make_backend()
+
+    async def full(job_id, priority=0):
+        # Another submission took the last slot while this one was being saved
+        raise QueueFullError(retry_after=30)
+
+    with TestClient(backend.app) as client:
+        monkeypatch.setattr(backend.scheduler, "submit", full)
+        response = client.post("/api/jobs", headers=HEADERS, json=REQUEST)
+        assert response.status_code == 503
+        jobs = client.get("/api/jobs").json()["jobs"]
+        assert [(job["status"], job["error"]) for job in jobs] == [("failed", "Rejected: job queue full")]
+        assert backend.jobs == {}
+
+    # Not resumed on the next start
+    assert asyncio.run(backend.checkpoints.load_unfinished()) == []
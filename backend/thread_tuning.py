@@ -0,0 +1,93 @@
+"""
+Adaptive module THREADS for Metasploit Recon Backend
+Chooses the THREADS value per (tool, target size) with AIMD: grow additively
+after fast clean runs, halve after timeouts or errors. The value is always
+capped by the target's host count and by free CPU and memory on this host.
+"""
+
+import os
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from config import Config
+from timeouts import size_bucket
+from tools import target_host_count
+
+OUTCOME_WINDOW = 20  # recent runs used for the failure rate
+
+
+def available_memory_mb() -> Optional[float]:
+    """MemAvailable from /proc/meminfo; None where that is not available"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def free_cores() -> float:
+    cores = os.cpu_count() or 1
+    try:
+        load = os.getloadavg()[0]
+    except (AttributeError, OSError):
+        # Windows has no load average
+        load = 0.0
+    return max(1.0, cores - load)
+
+
+class ThreadTuner:
+    """AIMD controller for the THREADS option of each tool"""
+
+    def __init__(self):
+        self.threads: Dict[Tuple[str, int], float] = {}
+        self.outcomes: Dict[Tuple[str, int], Deque[str]] = defaultdict(lambda: deque(maxlen=OUTCOME_WINDOW))
+        self._resource_cap: Optional[int] = None
+        self._resource_checked = 0.0
+
+    def resource_cap(self) -> int:
+        """Thread ceiling from free cores and memory, refreshed every few seconds"""
+        now = time.monotonic()
+        if self._resource_cap is None or now - self._resource_checked > 5:
+            cap = free_cores() * Config.THREADS_PER_CORE
+            memory = available_memory_mb()
+            if memory is not None:
+                cap = min(cap, memory / Config.THREAD_MEMORY_MB)
+            self._resource_cap = max(Config.THREADS_MIN, int(cap))
+            self._resource_checked = now
+        return self._resource_cap
+
+    def choose(self, tool_name: str, target: str) -> int:
+        key = (tool_name, size_bucket(target))
+        current = self.threads.setdefault(key, float(Config.THREADS_INITIAL))
+        ceiling = min(Config.THREADS_MAX, target_host_count(target), self.resource_cap())
+        return max(Config.THREADS_MIN, min(int(current), ceiling))
+
+    def failure_rate(self, tool_name: str, target: str) -> float:
+        outcomes = self.outcomes.get((tool_name, size_bucket(target)))
+        if not outcomes:
+            return 0.0
+        return sum(1 for outcome in outcomes if outcome != "success") / len(outcomes)
+
+    def record(self, tool_name: str, target: str, threads: int, result: Dict,
+               seconds: float, timeout: float):
+        """Feed back one run made with the given thread count"""
+        key = (tool_name, size_bucket(target))
+        if result.get("success"):
+            outcome = "success"
+        elif timeout and seconds >= timeout * 0.95:
+            outcome = "timeout"
+        else:
+            outcome = "error"
+        self.outcomes[key].append(outcome)
+
+        current = self.threads.get(key, float(Config.THREADS_INITIAL))
+        if outcome != "success":
+            # Multiplicative decrease from what was actually used
+            self.threads[key] = max(float(Config.THREADS_MIN), min(current, threads) / 2)
+        elif seconds < timeout / 2 and self.failure_rate(tool_name, target) <= Config.THREADS_MAX_FAILURE_RATE:
+            # Additive increase only while runs finish well inside their timeout
+            self.threads[key] = min(float(Config.THREADS_MAX), max(current, threads) + Config.THREADS_INCREASE)
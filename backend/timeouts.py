@@ -0,0 +1,67 @@
+"""
+Tool timeout resolution for Metasploit Recon Backend
+Per-tool timeouts come from Config.TOOL_TIMEOUTS, are capped by the remaining
+job budget (Config.JOB_TIMEOUT) and can adapt to observed runtimes
+"""
+
+import math
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from config import Config
+from tools import target_host_count
+
+DEFAULT_TOOL_TIMEOUT = 300
+
+
+def size_bucket(target: str) -> int:
+    """Coarse target size class: 0 for a single host, then one per power of 4 hosts"""
+    return int(math.log(max(1, target_host_count(target)), 4))
+
+
+class RuntimeHistory:
+    """Recent successful runtimes per (tool, target size bucket)"""
+
+    def __init__(self, samples: int = 50):
+        self.runtimes: Dict[Tuple[str, int], Deque[float]] = defaultdict(lambda: deque(maxlen=samples))
+
+    def record(self, tool_name: str, target: str, seconds: float):
+        self.runtimes[(tool_name, size_bucket(target))].append(seconds)
+
+    def p95(self, tool_name: str, target: str, min_samples: int = 10) -> Optional[float]:
+        samples = self.runtimes.get((tool_name, size_bucket(target)))
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class JobDeadline:
+    """Wall-clock budget shared by all tools of a job"""
+
+    def __init__(self, budget: float):
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def resolve_tool_timeout(tool_name: str, target: str, deadline: Optional[JobDeadline] = None,
+                         history: Optional[RuntimeHistory] = None) -> float:
+    """Timeout for one tool run: configured, optionally tightened by history, capped by the job budget"""
+    timeout = float(Config.TOOL_TIMEOUTS.get(tool_name, DEFAULT_TOOL_TIMEOUT))
+
+    if Config.ADAPTIVE_TIMEOUTS and history is not None:
+        p95 = history.p95(tool_name, target)
+        if p95 is not None:
+            # Never exceed the configured ceiling, never drop below the floor
+            adaptive = max(Config.MIN_TOOL_TIMEOUT, p95 * Config.ADAPTIVE_TIMEOUT_MARGIN)
+            timeout = min(timeout, adaptive)
+
+    if deadline is not None:
+        timeout = min(timeout, deadline.remaining())
+    return timeout
@@ -0,0 +1,119 @@
+"""
+Reconnaissance tool definitions for Metasploit Recon Backend
+Maps UI tool names to Metasploit modules and builds module commands
+"""
+
+import ipaddress
+from typing import Dict, List, Any
+
+# Map tool names to Metasploit modules
+MODULE_MAPPING = {
+    "ping-sweep": "auxiliary/scanner/discovery/udp_sweep",
+    "tcp-syn-scan": "auxiliary/scanner/portscan/syn",
+    "udp-scan": "auxiliary/scanner/discovery/udp_sweep",
+    "service-version-scan": "auxiliary/scanner/portscan/tcp",
+    "os-fingerprint": "auxiliary/scanner/portscan/tcp",
+    "smb-enum": "auxiliary/scanner/smb/smb_enumshares",
+    "snmp-enum": "auxiliary/scanner/snmp/snmp_enum",
+    "dns-enum": "auxiliary/gather/dns_enum",
+    "web-crawl": "auxiliary/scanner/http/crawl",
+    "web-app-scan": "auxiliary/scanner/http/http_version",
+    "cve-lookup": "auxiliary/scanner/portscan/tcp"
+}
+
+# Tool config keys sent to the module as datastore options
+CONFIG_OPTIONS = {
+    "threads": "THREADS",
+    "timeout": "TIMEOUT"
+}
+
+# Tools exposed through /api/tools; the category drives job planning
+TOOL_CATALOG = [
+    {
+        "name": "ping-sweep",
+        "description": "Ping sweep to discover live hosts",
+        "category": "discovery",
+        "config_options": ["timeout", "threads"]
+    },
+    {
+        "name": "tcp-syn-scan",
+        "description": "TCP SYN port scan",
+        "category": "port_scan",
+        "config_options": ["port_range", "threads", "timeout"]
+    },
+    {
+        "name": "udp-scan",
+        "description": "UDP port scan",
+        "category": "port_scan",
+        "config_options": ["port_range", "timeout"]
+    },
+    {
+        "name": "service-version-scan",
+        "description": "Service and version detection",
+        "category": "service_scan",
+        "config_options": ["intensity", "timeout"]
+    },
+    {
+        "name": "os-fingerprint",
+        "description": "Operating system fingerprinting",
+        "category": "fingerprint",
+        "config_options": ["timeout"]
+    },
+    {
+        "name": "smb-enum",
+        "description": "SMB enumeration",
+        "category": "network_service",
+        "config_options": ["timeout", "username", "password"]
+    },
+    {
+        "name": "snmp-enum",
+        "description": "SNMP enumeration",
+        "category": "network_service",
+        "config_options": ["community_strings", "timeout"]
+    },
+    {
+        "name": "dns-enum",
+        "description": "DNS enumeration",
+        "category": "network_service",
+        "config_options": ["timeout", "threads"]
+    },
+    {
+        "name": "web-crawl",
+        "description": "Web crawling and spidering",
+        "category": "web",
+        "config_options": ["user_agent", "max_depth", "timeout"]
+    },
+    {
+        "name": "web-app-scan",
+        "description": "Web application vulnerability scanning",
+        "category": "web",
+        "config_options": ["timeout", "threads"]
+    },
+    {
+        "name": "cve-lookup",
+        "description": "CVE vulnerability lookup",
+        "category": "vulnerability",
+        "config_options": ["timeout"]
+    }
+]
+
+TOOL_CATEGORIES = {tool["name"]: tool["category"] for tool in TOOL_CATALOG}
+
+
+def target_host_count(target: str) -> int:
+    """Number of addresses covered by a target; hostnames count as one host"""
+    try:
+        return ipaddress.ip_network(target, strict=False).num_addresses
+    except ValueError:
+        return 1
+
+
+def build_module_commands(module: str, target: str, config: Dict[str, Any]) -> List[str]:
+    """Generate the console commands that configure and run a module"""
+    return [
+        f"use {module}",
+        f"set RHOSTS {target}",
+        f"set THREADS {config.get('threads', 10)}",
+        f"set TIMEOUT {config.get('timeout', 5)}",
+        "run"
+    ]
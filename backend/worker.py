@@ -0,0 +1,107 @@
+"""
+Scanner worker node for Metasploit Recon Backend
+Claims tool tasks from the Redis queue, runs them with the local Metasploit
+install and publishes output lines and results back to the API process.
+
+Run with: python app.py worker  (or python -m app worker)
+"""
+
+import asyncio
+import socket
+from pathlib import Path
+from typing import Dict, List
+
+from config import Config
+from redis_queue import RedisTaskQueue
+from workspace import make_dir
+
+
+class TaskWorker:
+    """Runs claimed tool tasks, heartbeating their leases while they execute"""
+
+    def __init__(self, backend, queue: RedisTaskQueue, concurrency: int):
+        self.backend = backend
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.name = socket.gethostname()
+
+    async def run(self):
+        if self.backend.rpc_pool:
+            await self.backend.rpc_pool.start()
+        await self.backend.admission.start()
+        self.backend.start_prewarm()
+        try:
+            await asyncio.gather(
+                self._reaper(),
+                *(self._consumer() for _ in range(self.concurrency))
+            )
+        finally:
+            await self.backend.admission.stop()
+            if self.backend.rpc_pool:
+                await self.backend.rpc_pool.stop()
+            await self.queue.close()
+
+    async def _reaper(self):
+        # Every worker reaps; lease removal is atomic so a task is requeued once
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 2)
+            await self.queue.requeue_expired()
+
+    async def _consumer(self):
+        while True:
+            task = await self.queue.claim(timeout=5, worker=self.name)
+            if task:
+                await self.process(task)
+
+    async def process(self, task: Dict):
+        task_id = task["task_id"]
+        job_dir = Path(self.backend.workspace_dir) / task["job_id"]
+        await make_dir(job_dir)
+
+        lines: List[str] = []
+        run = asyncio.create_task(self.backend.execute_metasploit_tool(
+            task["tool"],
+            task["target"],
+            task["config"],
+            job_dir,
+            task["timeout"],
+            file_stem=task.get("file_stem"),
+            on_line=lines.append,
+            workspace=task.get("workspace"),
+            local=True
+        ))
+
+        # Heartbeat and flush output until the tool finishes
+        lost = False
+        while not run.done():
+            await asyncio.wait([run], timeout=min(1.0, self.queue.lease_seconds / 3))
+            pending, lines[:] = lines[:], []
+            await self.queue.publish_lines(task_id, pending)
+            state = await self.queue.heartbeat(task_id)
+            if state != "ok" and not run.done():
+                # Cancelled by the API, or our lease was reaped and the task requeued
+                lost = state == "lost"
+                run.cancel()
+
+        await self.queue.publish_lines(task_id, lines)
+        if lost:
+            return
+        if run.cancelled():
+            result = {"success": False, "error": "Tool execution cancelled", "output": ""}
+        else:
+            result = run.result()
+        result["worker"] = self.name
+        await self.queue.complete(task_id, result)
+
+
+def run_worker():
+    """Entry point for a scanner worker node"""
+    from app import MetasploitReconBackend
+
+    backend = MetasploitReconBackend()
+    queue = RedisTaskQueue.from_url(
+        Config.REDIS_URL,
+        lease_seconds=Config.TASK_LEASE_SECONDS,
+        max_attempts=Config.TASK_MAX_ATTEMPTS
+    )
+    asyncio.run(TaskWorker(backend, queue, Config.WORKER_CONCURRENCY).run())
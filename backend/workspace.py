@@ -0,0 +1,49 @@
+"""
+Workspace file helpers for Metasploit Recon Backend
+Blocking filesystem calls are offloaded to threads so the event loop stays free
+"""
+
+import asyncio
+import os
+from pathlib import Path
+
+
+def _write_text(path: Path, data: str):
+    with open(path, 'w') as f:
+        f.write(data)
+
+
+def write_atomic(path: Path, data: str):
+    """Atomically replace a text file; blocking, for code already off the event loop"""
+    # Write beside the target, then rename over it: readers never see a partial file
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _read_text(path: Path) -> str:
+    if not path.exists():
+        return ""
+    with open(path, 'r', errors='replace') as f:
+        return f.read()
+
+
+async def make_dir(path: Path):
+    """Create a directory (and parents) without blocking the event loop"""
+    await asyncio.to_thread(path.mkdir, parents=True, exist_ok=True)
+
+
+async def write_text(path: Path, data: str):
+    """Write a text file without blocking the event loop"""
+    await asyncio.to_thread(_write_text, path, data)
+
+
+async def replace_text(path: Path, data: str):
+    """Atomically replace a text file without blocking the event loop"""
+    await asyncio.to_thread(write_atomic, path, data)
+
+
+async def read_text(path: Path) -> str:
+    """Read a text file without blocking the event loop; missing files read as empty"""
+    return await asyncio.to_thread(_read_text, path)